@@ -1,5 +1,7 @@
 """Setup script for aba package with custom build command for React frontend."""
 
+import hashlib
+import os
 import subprocess
 import sys
 from pathlib import Path
@@ -7,6 +9,51 @@ from setuptools import setup
 from setuptools.command.build_py import build_py
 
 
+# Frontend inputs that affect the build output (relative to web-ui/)
+FRONTEND_SOURCES = ["src", "public", "index.html", "package.json", "package-lock.json",
+                    "vite.config.ts", "tsconfig.json", "tsconfig.app.json", "tsconfig.node.json"]
+
+# Where vite writes the built frontend (see build.outDir in vite.config.ts)
+FRONTEND_OUTPUT = Path(__file__).parent / "src" / "aba" / "web" / "static"
+
+
+def _newest_mtime(paths) -> int:
+    """Return the newest st_mtime_ns among the given files and directory trees.
+
+    Args:
+        paths: Files or directories to scan (missing paths are ignored)
+
+    Returns:
+        Newest modification time in nanoseconds, or 0 if nothing was found
+    """
+    newest = 0
+    for path in paths:
+        path = os.fspath(path)
+        if os.path.isfile(path):
+            newest = max(newest, os.stat(path).st_mtime_ns)
+            continue
+        for root, _dirs, files in os.walk(path):
+            for name in files:
+                newest = max(newest, os.stat(os.path.join(root, name)).st_mtime_ns)
+    return newest
+
+
+def _frontend_up_to_date(frontend_dir: Path) -> bool:
+    """Check whether the built frontend is newer than all of its sources."""
+    built = _newest_mtime([FRONTEND_OUTPUT])
+    if not built:
+        return False
+    return built >= _newest_mtime(frontend_dir / name for name in FRONTEND_SOURCES)
+
+
+def _lockfile_hash(frontend_dir: Path) -> str | None:
+    """Return the sha256 of package-lock.json, or None if there is no lockfile."""
+    lockfile = frontend_dir / "package-lock.json"
+    if not lockfile.is_file():
+        return None
+    return hashlib.sha256(lockfile.read_bytes()).hexdigest()
+
+
 class BuildWithFrontend(build_py):
     """Custom build command that builds the React frontend before packaging."""
 
@@ -18,6 +65,11 @@ class BuildWithFrontend(build_py):
         if not frontend_dir.exists():
             print("Warning: web-ui directory not found, skipping frontend build")
         else:
+            if _frontend_up_to_date(frontend_dir):
+                print("Frontend up-to-date, skipping npm build")
+                super().run()
+                return
+
             print("Building React frontend...")
 
             # Check if npm is available
@@ -29,12 +81,27 @@ class BuildWithFrontend(build_py):
                 super().run()
                 return
 
-            # Install dependencies if node_modules doesn't exist
-            if not (frontend_dir / "node_modules").exists():
+            # Install dependencies unless node_modules matches the current lockfile
+            node_modules = frontend_dir / "node_modules"
+            lock_marker = node_modules / ".lockhash"
+            lock_hash = _lockfile_hash(frontend_dir)
+
+            if lock_hash is None:
+                needs_install = not node_modules.exists()
+            else:
+                needs_install = not (lock_marker.is_file() and lock_marker.read_text() == lock_hash)
+
+            if needs_install:
                 print("Installing npm dependencies...")
+                # npm reads NPM_CONFIG_CACHE from the environment, so CI can point
+                # it at a persistent cache directory shared between builds
+                if lock_hash is None:
+                    command = ["npm", "install"]
+                else:
+                    command = ["npm", "ci", "--prefer-offline", "--no-audit", "--no-fund"]
                 try:
                     subprocess.run(
-                        ["npm", "install"],
+                        command,
                         cwd=frontend_dir,
                         check=True
                     )
@@ -42,6 +109,9 @@ class BuildWithFrontend(build_py):
                     print(f"Error installing npm dependencies: {e}")
                     sys.exit(1)
 
+                if lock_hash is not None:
+                    lock_marker.write_text(lock_hash)
+
             # Run the build
             try:
                 subprocess.run(
@@ -1,20 +1,42 @@
 """Agent Builder package."""
 
-from .agent import Agent
-from .agent_manager import AgentManager
-from .capabilities import Capability, CAPABILITIES
-from .language_model import LanguageModel, OpenRouterLanguageModel, RuleBasedLanguageModel
-from .runtime import AgentRuntime
-from .tools import TOOL_REGISTRY
-
-__all__ = [
-    "Agent",
-    "AgentManager",
-    "Capability",
-    "CAPABILITIES",
-    "LanguageModel",
-    "RuleBasedLanguageModel",
-    "OpenRouterLanguageModel",
-    "AgentRuntime",
-    "TOOL_REGISTRY",
-]
+from __future__ import annotations
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+# Public names mapped to the submodule that defines them. They are imported
+# on first attribute access (PEP 562) so light entry points such as
+# `aba --list` do not pay for the runtime, tools and HTTP client imports.
+_EXPORTS = {
+    "Agent": ".agent",
+    "AgentManager": ".agent_manager",
+    "Capability": ".capabilities",
+    "CAPABILITIES": ".capabilities",
+    "LanguageModel": ".language_model",
+    "RuleBasedLanguageModel": ".language_model",
+    "OpenRouterLanguageModel": ".language_model",
+    "AgentRuntime": ".runtime",
+    "TOOL_REGISTRY": ".tools",
+}
+
+__all__ = list(_EXPORTS)
+
+if TYPE_CHECKING:  # pragma: no cover - static analysis only
+    from .agent import Agent
+    from .agent_manager import AgentManager
+    from .capabilities import CAPABILITIES, Capability
+    from .language_model import LanguageModel, OpenRouterLanguageModel, RuleBasedLanguageModel
+    from .runtime import AgentRuntime
+    from .tools import TOOL_REGISTRY
+
+
+def __getattr__(name: str) -> Any:
+    """Import public names lazily from their defining submodule."""
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,337 @@
+"""OpenRouter-backed language model.
+
+Kept separate from aba.language_model so the offline rule-based model can
+be imported without loading the HTTP client code.
+"""
+
+from __future__ import annotations
+
+import atexit
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+import importlib.util
+import os
+from typing import Any, Iterator
+
+from . import _json
+
+# Headers sent with every OpenRouter request (Authorization is added per call).
+# Request bodies are pre-encoded with aba._json, so Content-Type is set here.
+_OPENROUTER_HEADERS = {
+    "Content-Type": "application/json",
+    "HTTP-Referer": "https://github.com/anthropics/agent-building-agent",
+    "X-Title": "Agent Building Agent",
+}
+
+# Shared HTTP client so chat turns reuse one keep-alive connection, and whether
+# it is an httpx.Client (True) or the requests.Session fallback (False)
+_CLIENT: Any = None
+_CLIENT_IS_HTTPX = True
+
+
+def _get_client() -> Any:
+    """Return the shared HTTP client, creating it on first use.
+
+    Prefers an httpx.Client (HTTP/2 when the optional h2 package is
+    installed) and falls back to a requests.Session.
+
+    Returns:
+        HTTP client configured with the static OpenRouter headers
+
+    Raises:
+        RuntimeError: If neither httpx nor requests is installed
+    """
+    global _CLIENT, _CLIENT_IS_HTTPX
+    if _CLIENT is None:
+        try:
+            import httpx
+        except ModuleNotFoundError:
+            httpx = None
+
+        if httpx is not None:
+            client = httpx.Client(
+                headers=_OPENROUTER_HEADERS,
+                http2=importlib.util.find_spec("h2") is not None,
+                limits=httpx.Limits(max_connections=4, max_keepalive_connections=1),
+            )
+        else:
+            try:
+                import requests
+                from requests.adapters import HTTPAdapter
+            except ModuleNotFoundError as exc:  # pragma: no cover - dependency missing
+                raise RuntimeError(
+                    "The 'httpx' or 'requests' package is required to use "
+                    "OpenRouterLanguageModel. Install it with 'pip install httpx'."
+                ) from exc
+
+            client = requests.Session()
+            client.headers.update(_OPENROUTER_HEADERS)
+            client.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+
+        atexit.register(client.close)
+        _CLIENT, _CLIENT_IS_HTTPX = client, httpx is not None
+    return _CLIENT
+
+
+def _post(url: str, api_key: str, body: bytes, timeout: float) -> Any:
+    """POST an encoded JSON body through the shared client.
+
+    Args:
+        url: Endpoint URL
+        api_key: OpenRouter API key for the Authorization header
+        body: Encoded JSON request payload
+        timeout: Request timeout in seconds
+
+    Returns:
+        Response object with raise_for_status() and content
+    """
+    client = _get_client()
+    headers = {"Authorization": f"Bearer {api_key}"}
+    # httpx takes a raw body as content=, requests as data=
+    if _CLIENT_IS_HTTPX:
+        return client.post(url, headers=headers, content=body, timeout=timeout)
+    return client.post(url, headers=headers, data=body, timeout=timeout)
+
+
+@contextmanager
+def _post_stream(url: str, api_key: str, body: bytes, timeout: float) -> Iterator[Iterator[str]]:
+    """POST an encoded JSON body and iterate over the streamed response lines.
+
+    Args:
+        url: Endpoint URL
+        api_key: OpenRouter API key for the Authorization header
+        body: Encoded JSON request payload
+        timeout: Request timeout in seconds
+
+    Yields:
+        Iterator over decoded response lines
+    """
+    client = _get_client()
+    headers = {"Authorization": f"Bearer {api_key}"}
+    if _CLIENT_IS_HTTPX:
+        with client.stream(
+            "POST", url, headers=headers, content=body, timeout=timeout
+        ) as response:
+            response.raise_for_status()
+            yield response.iter_lines()
+    else:
+        with client.post(
+            url, headers=headers, data=body, timeout=timeout, stream=True
+        ) as response:
+            response.raise_for_status()
+            yield (line.decode("utf-8") for line in response.iter_lines())
+
+
+@dataclass
+class OpenRouterLanguageModel:
+    """Language model implementation backed by the OpenRouter API."""
+
+    model: str = "openai/gpt-4o-mini"
+    temperature: float = 0.7
+    api_key_env: str = "OPENROUTER_API_KEY"
+    base_url: str = "https://openrouter.ai/api/v1/chat/completions"
+    timeout: float = 30.0
+    _api_key: str | None = field(default=None, init=False, repr=False)
+    # The last tools list sent and its encoding; holding the list keeps its id
+    # from being reused while cached
+    _tools_cache: tuple[list[dict], bytes] | None = field(default=None, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        """Read the API key once instead of on every request."""
+        self._api_key = os.getenv(self.api_key_env)
+
+    def _get_api_key(self) -> str:
+        """Return the OpenRouter API key.
+
+        Raises:
+            RuntimeError: If the API key environment variable is not set
+        """
+        if not self._api_key:
+            # The variable may have been set after the model was created
+            self._api_key = os.getenv(self.api_key_env)
+            if not self._api_key:
+                raise RuntimeError(
+                    "OpenRouter API key is required. Set the "
+                    f"{self.api_key_env!r} environment variable."
+                )
+        return self._api_key
+
+    def _encode_request(self, request_body: dict, tools: list[dict] | None) -> bytes:
+        """Encode a chat request, reusing the tools encoding across calls.
+
+        A tool loop sends the same tools list with every request of a turn,
+        so its JSON is only encoded when a different list is passed.
+
+        Args:
+            request_body: Request payload without tools
+            tools: Optional list of tool definitions for function calling
+
+        Returns:
+            Encoded JSON request payload
+        """
+        body = _json.dumps(request_body)
+        if not tools:
+            return body
+
+        cache = self._tools_cache
+        if cache is None or cache[0] is not tools:
+            cache = self._tools_cache = (tools, _json.dumps(tools))
+
+        # Splice the fields in before the payload's closing brace
+        return body[:-1] + b',"tools":' + cache[1] + b',"tool_choice":"auto"}'
+
+    def complete(self, prompt: str) -> str:  # noqa: D401 - protocol short description
+        """Legacy completion method (for backward compatibility).
+
+        Args:
+            prompt: Text prompt to send to the model
+
+        Returns:
+            Model's text response
+        """
+        api_key = self._get_api_key()
+
+        response = _post(
+            self.base_url,
+            api_key,
+            _json.dumps({
+                "model": self.model,
+                "messages": [{"role": "user", "content": prompt}],
+                "temperature": self.temperature,
+            }),
+            self.timeout,
+        )
+        response.raise_for_status()
+
+        payload = _json.loads(response.content)
+        try:
+            content = payload["choices"][0]["message"]["content"]
+        except (KeyError, IndexError, TypeError) as exc:  # pragma: no cover - defensive
+            raise RuntimeError("Unexpected response payload from OpenRouter") from exc
+
+        if not isinstance(content, str):  # pragma: no cover - defensive
+            raise RuntimeError("OpenRouter response did not include text content")
+
+        return content.strip()
+
+    def chat(
+        self,
+        messages: list[dict],
+        tools: list[dict] | None = None
+    ) -> tuple[dict, dict]:
+        """Chat with function calling support.
+
+        Args:
+            messages: List of message dictionaries with 'role' and 'content' keys
+            tools: Optional list of tool definitions for function calling
+
+        Returns:
+            Tuple of (message dict, usage dict) where:
+            - message: Raw API response containing message and/or tool_calls
+            - usage: Token usage stats (prompt_tokens, completion_tokens, total_tokens)
+        """
+        api_key = self._get_api_key()
+
+        request_body = {
+            "model": self.model,
+            "messages": messages,
+            "temperature": self.temperature,
+        }
+
+        body = self._encode_request(request_body, tools)
+        response = _post(self.base_url, api_key, body, self.timeout)
+        response.raise_for_status()
+
+        payload = _json.loads(response.content)
+        try:
+            message = payload["choices"][0]["message"]
+            usage = payload.get("usage", {
+                "prompt_tokens": 0,
+                "completion_tokens": 0,
+                "total_tokens": 0
+            })
+            return message, usage
+        except (KeyError, IndexError, TypeError) as exc:  # pragma: no cover - defensive
+            raise RuntimeError("Unexpected response payload from OpenRouter") from exc
+
+    def chat_stream(
+        self,
+        messages: list[dict],
+        tools: list[dict] | None = None
+    ) -> Iterator[dict]:
+        """Stream a chat turn from OpenRouter's Server-Sent Events API.
+
+        Events use the same shapes as the web StreamingOpenRouterModel.
+
+        Args:
+            messages: List of message dictionaries with 'role' and 'content' keys
+            tools: Optional list of tool definitions for function calling
+
+        Yields:
+            - {"type": "content", "delta": str} for each text chunk, as it arrives
+            - {"type": "tool_calls", "calls": [...]} once, if the model called tools
+            - {"type": "done", "usage": {...}} last, with token usage
+
+        Raises:
+            RuntimeError: If the API key is missing or the stream reports an error
+        """
+        api_key = self._get_api_key()
+
+        request_body = {
+            "model": self.model,
+            "messages": messages,
+            "temperature": self.temperature,
+            "stream": True,
+            "stream_options": {"include_usage": True},
+        }
+        body = self._encode_request(request_body, tools)
+
+        # Tool calls arrive in fragments keyed by index
+        tool_calls: dict[int, dict[str, Any]] = {}
+        usage = None
+
+        with _post_stream(self.base_url, api_key, body, self.timeout) as lines:
+            for line in lines:
+                # Skip blank keep-alive lines and SSE comments
+                if not line.startswith("data: "):
+                    continue
+
+                data = line[6:]
+                if data == "[DONE]":
+                    break
+
+                chunk = _json.loads(data)
+                if "error" in chunk:
+                    raise RuntimeError(chunk["error"].get("message", "Unknown OpenRouter error"))
+
+                # With include_usage, usage comes in a final chunk without choices
+                if chunk.get("usage"):
+                    usage = chunk["usage"]
+                if not chunk.get("choices"):
+                    continue
+
+                delta = chunk["choices"][0].get("delta") or {}
+                if delta.get("content"):
+                    yield {"type": "content", "delta": delta["content"]}
+
+                for call_delta in delta.get("tool_calls") or ():
+                    call = tool_calls.setdefault(call_delta.get("index", 0), {
+                        "id": "",
+                        "type": "function",
+                        "function": {"name": "", "arguments": ""},
+                    })
+                    if call_delta.get("id"):
+                        call["id"] = call_delta["id"]
+                    function = call_delta.get("function") or {}
+                    if function.get("name"):
+                        call["function"]["name"] = function["name"]
+                    if function.get("arguments"):
+                        call["function"]["arguments"] += function["arguments"]
+
+        if tool_calls:
+            yield {"type": "tool_calls", "calls": [tool_calls[i] for i in sorted(tool_calls)]}
+
+        yield {
+            "type": "done",
+            "usage": usage or {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        }
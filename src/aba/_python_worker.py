@@ -0,0 +1,237 @@
+"""Warm Python interpreters for the exec_python tool.
+
+Starting a new interpreter for every snippet costs tens of milliseconds, so
+exec_python hands snippets to long-lived worker processes instead. A worker
+never runs snippets itself: it forks a child for each one, so every snippet
+starts from the same clean, already initialized interpreter and nothing it
+does (patched modules, builtins, os._exit) reaches the worker or later
+snippets. Each request carries the host's current directory and
+environment, which the child adopts before running the snippet, so a pooled
+worker behaves like a process started fresh from the host.
+"""
+
+from __future__ import annotations
+
+import atexit
+import marshal
+import os
+import select
+import struct
+import subprocess
+import sys
+import threading
+import time
+
+# Runs inside the worker. Requests are two little-endian u64 lengths and an
+# f64 timeout followed by the marshalled (cwd, environ) context and UTF-8
+# code; replies are a timed-out flag and two u64
+# lengths followed by the captured stdout and stderr. The forked child writes
+# to fds 1 and 2, which point at temp files, so output from C extensions and
+# child processes is captured too, and it never sees the request or reply
+# pipes.
+_WORKER_SOURCE = r'''
+import marshal, os, select, signal, struct, sys, tempfile, traceback
+
+requests = os.fdopen(os.dup(0), "rb")
+replies = os.fdopen(os.dup(1), "wb")
+null = os.open(os.devnull, os.O_RDWR)
+for fd in (0, 1, 2):
+    os.dup2(null, fd)
+os.close(null)
+captures = (tempfile.TemporaryFile(), tempfile.TemporaryFile())
+
+
+def run_child(context, code):
+    requests.close()
+    replies.close()
+    os.dup2(captures[0].fileno(), 1)
+    os.dup2(captures[1].fileno(), 2)
+    try:
+        cwd, environ = marshal.loads(context)
+        os.environb.clear()
+        os.environb.update(environ)
+        os.chdir(cwd)
+        exec(compile(code, "<string>", "exec"), {"__name__": "__main__", "__builtins__": __builtins__})
+    except SystemExit as exc:
+        if exc.code is not None and not isinstance(exc.code, int):
+            print(exc.code, file=sys.stderr)
+    except BaseException as exc:
+        traceback.print_exception(type(exc), exc, exc.__traceback__.tb_next)
+    try:
+        sys.stdout.flush()
+        sys.stderr.flush()
+    finally:
+        os._exit(0)
+
+
+while True:
+    header = requests.read(24)
+    if len(header) < 24:
+        break
+    context_size, code_size, timeout = struct.unpack("<QQd", header)
+    context = requests.read(context_size)
+    code = requests.read(code_size).decode("utf-8")
+    for capture in captures:
+        capture.seek(0)
+        capture.truncate()
+    # The child holds the write end, so the read end becomes readable (EOF)
+    # when the child exits
+    exited_r, exited_w = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(exited_r)
+        run_child(context, code)
+    os.close(exited_w)
+    timed_out = not select.select([exited_r], [], [], timeout)[0]
+    os.close(exited_r)
+    if timed_out:
+        os.kill(pid, signal.SIGKILL)
+    os.waitpid(pid, 0)
+    output = []
+    for capture in captures:
+        capture.seek(0)
+        output.append(capture.read())
+    replies.write(struct.pack("<?QQ", timed_out, *map(len, output)) + b"".join(output))
+    replies.flush()
+'''
+
+# Extra seconds to wait for a reply past the snippet's own timeout, which the
+# worker enforces; a worker that misses this is stuck and gets replaced
+_REPLY_GRACE = 5.0
+
+# Idle workers; a worker is checked out for one snippet at a time, so
+# concurrent tool calls each get their own
+_IDLE: list[PythonWorker] = []
+_IDLE_LOCK = threading.Lock()
+
+
+class WorkerDied(Exception):
+    """Raised when a worker exits before replying."""
+
+
+class PythonWorker:
+    """One warm interpreter that forks a child per snippet."""
+
+    def __init__(self) -> None:
+        """Start the worker process.
+
+        Raises:
+            OSError: If the interpreter cannot be started
+        """
+        self.process = subprocess.Popen(
+            [sys.executable, "-u", "-c", _WORKER_SOURCE],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+
+    def run(self, code: str, timeout: float) -> tuple[str, str, bool]:
+        """Run a snippet and return its output.
+
+        Args:
+            code: Python source to execute
+            timeout: Seconds the snippet may run before it is killed
+
+        Returns:
+            Tuple of (stdout, stderr, timed_out); output is whatever the
+            snippet wrote before it finished or was killed
+
+        Raises:
+            BrokenPipeError: If the worker had already exited (nothing ran)
+            WorkerDied: If the worker exited while running the snippet
+            subprocess.TimeoutExpired: If the worker itself stopped responding
+        """
+        context = marshal.dumps((os.getcwdb(), dict(os.environb)))
+        data = code.encode("utf-8")
+        self.process.stdin.write(
+            struct.pack("<QQd", len(context), len(data), timeout) + context + data
+        )
+        self.process.stdin.flush()
+
+        deadline = time.monotonic() + timeout + _REPLY_GRACE
+        timed_out, stdout_len, stderr_len = struct.unpack(
+            "<?QQ", self._read(17, deadline, code, timeout)
+        )
+        output = self._read(stdout_len + stderr_len, deadline, code, timeout)
+        return (
+            output[:stdout_len].decode("utf-8", "replace"),
+            output[stdout_len:].decode("utf-8", "replace"),
+            timed_out,
+        )
+
+    def _read(self, size: int, deadline: float, code: str, timeout: float) -> bytes:
+        """Read exactly size reply bytes before the deadline."""
+        fd = self.process.stdout.fileno()
+        chunks = []
+        while size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([fd], [], [], remaining)[0]:
+                raise subprocess.TimeoutExpired(code, timeout)
+            chunk = os.read(fd, size)
+            if not chunk:
+                raise WorkerDied(f"exit code {self.process.wait()}")
+            chunks.append(chunk)
+            size -= len(chunk)
+        return b"".join(chunks)
+
+    def close(self) -> None:
+        """Stop the worker process."""
+        self.process.kill()
+        self.process.wait()
+        self.process.stdin.close()
+        self.process.stdout.close()
+
+
+def run_snippet(code: str, timeout: float) -> tuple[str, str]:
+    """Run a snippet on an idle worker, starting one if needed.
+
+    Args:
+        code: Python source to execute
+        timeout: Seconds to wait for the snippet to finish
+
+    Returns:
+        Tuple of (stdout, stderr) text
+
+    Raises:
+        OSError: If no worker can be started
+        WorkerDied: If the worker exited while running the snippet
+        subprocess.TimeoutExpired: If the snippet did not finish in time
+    """
+    with _IDLE_LOCK:
+        worker = _IDLE.pop() if _IDLE else None
+
+    if worker is not None:
+        try:
+            result = worker.run(code, timeout)
+        except BrokenPipeError:
+            # The idle worker had exited; nothing ran, so use a fresh one
+            worker.close()
+            worker = None
+        except BaseException:
+            worker.close()
+            raise
+
+    if worker is None:
+        worker = PythonWorker()
+        try:
+            result = worker.run(code, timeout)
+        except BaseException:
+            worker.close()
+            raise
+
+    # The worker killed a timed-out snippet itself, so it can be reused
+    with _IDLE_LOCK:
+        _IDLE.append(worker)
+
+    stdout, stderr, timed_out = result
+    if timed_out:
+        raise subprocess.TimeoutExpired(code, timeout, stdout, stderr)
+    return stdout, stderr
+
+
+@atexit.register
+def _close_idle_workers() -> None:
+    """Stop idle workers when the interpreter exits."""
+    with _IDLE_LOCK:
+        while _IDLE:
+            _IDLE.pop().close()
@@ -5,6 +5,18 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 from datetime import datetime
 
+# Default agent configuration (copied for each agent, never mutated)
+DEFAULT_CONFIG = {
+    "model": "openai/gpt-4o-mini",
+    "temperature": 0.7,
+    "preserve_history": True
+}
+
+
+def _now_iso() -> str:
+    """Return the current local time as an ISO 8601 string."""
+    return datetime.now().isoformat()
+
 
 @dataclass
 class Agent:
@@ -17,33 +29,28 @@ class Agent:
     name: str
     description: str
     version: str = "1.0"
-    created: str = field(default_factory=lambda: datetime.now().isoformat())
-    last_used: str = field(default_factory=lambda: datetime.now().isoformat())
+    created: str = ""  # Set to the construction time when left empty
+    last_used: str = ""  # Set to the construction time when left empty
 
     capabilities: list[str] = field(default_factory=list)
     system_prompt: str = ""
 
-    config: dict = field(default_factory=lambda: {
-        "model": "openai/gpt-4o-mini",
-        "temperature": 0.7,
-        "preserve_history": True
-    })
+    config: dict = field(default_factory=DEFAULT_CONFIG.copy)
 
     metadata: dict = field(default_factory=dict)
 
+    def __post_init__(self) -> None:
+        """Fill in missing timestamps with a single clock read."""
+        if not self.created or not self.last_used:
+            now = _now_iso()
+            self.created = self.created or now
+            self.last_used = self.last_used or now
+
     def to_dict(self) -> dict:
         """Serialize agent to dictionary for JSON storage."""
-        return {
-            "name": self.name,
-            "description": self.description,
-            "version": self.version,
-            "created": self.created,
-            "last_used": self.last_used,
-            "capabilities": self.capabilities,
-            "system_prompt": self.system_prompt,
-            "config": self.config,
-            "metadata": self.metadata,
-        }
+        # Fields hold only plain JSON values, so a shallow copy of the
+        # instance dict matches the field-by-field form (in field order)
+        return self.__dict__.copy()
 
     @classmethod
     def from_dict(cls, data: dict) -> Agent:
@@ -54,18 +61,18 @@ class Agent:
             # Legacy format: "cap1,cap2,cap3" -> ["cap1", "cap2", "cap3"]
             capabilities = [c.strip() for c in capabilities.split(",")] if capabilities else []
 
-        return cls(
+        # Populate the instance dict directly instead of going through __init__
+        agent = cls.__new__(cls)
+        agent.__dict__.update(
             name=data["name"],
             description=data["description"],
             version=data.get("version", "1.0"),
-            created=data.get("created", datetime.now().isoformat()),
-            last_used=data.get("last_used", datetime.now().isoformat()),
+            created=data.get("created", ""),
+            last_used=data.get("last_used", ""),
             capabilities=capabilities,
             system_prompt=data.get("system_prompt", ""),
-            config=data.get("config", {
-                "model": "openai/gpt-4o-mini",
-                "temperature": 0.7,
-                "preserve_history": True
-            }),
+            config=data["config"] if "config" in data else DEFAULT_CONFIG.copy(),
             metadata=data.get("metadata", {}),
         )
+        agent.__post_init__()
+        return agent
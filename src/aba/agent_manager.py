@@ -2,10 +2,14 @@
 
 from __future__ import annotations
 
-import json
+import os
+import tempfile
+import threading
+from dataclasses import replace
 from pathlib import Path
 from typing import Optional
 
+from . import _json
 from .agent import Agent
 
 # System prompt for the default agent-builder agent
@@ -32,6 +36,85 @@ When a user asks you to create an agent, use the create_agent tool to write the
 JSON file. Be thoughtful about which capabilities to grant."""
 
 
+def _copy_agent(agent: Agent) -> Agent:
+    """Copy an agent so callers can mutate it without touching the cache.
+
+    Args:
+        agent: Agent to copy
+
+    Returns:
+        New Agent with its own capabilities list, config and metadata dicts
+    """
+    return replace(
+        agent,
+        capabilities=list(agent.capabilities),
+        config=dict(agent.config),
+        metadata=dict(agent.metadata),
+    )
+
+
+def _write_json_atomic(path: Path, obj: object, indent: bool = False) -> None:
+    """Write an object as JSON so readers never see a partial file.
+
+    The encoded bytes go to a uniquely named temp file through an unbuffered
+    FileIO (no buffered or text layers for a one-shot write), which is then
+    renamed over the target, so concurrent writers never share a temp file.
+
+    Args:
+        path: File to write
+        obj: JSON-serializable object
+        indent: Pretty-print with two-space indentation
+    """
+    fd, tmp_file = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with open(fd, "wb", buffering=0) as f:
+            # Raw writes may be partial, so write until everything is out
+            view = memoryview(_json.dumps(obj, indent=indent))
+            while view:
+                view = view[f.write(view):]
+        os.replace(tmp_file, path)
+    except BaseException:
+        os.unlink(tmp_file)
+        raise
+
+
+def _history_entry(role: str, msg: str, metadata: dict) -> dict:
+    """Build the saved form of a history item for CLI and web history files.
+
+    Args:
+        role: "user" or "agent"
+        msg: Message text
+        metadata: Tool call and usage metadata
+
+    Returns:
+        Dictionary for the history file
+    """
+    entry = {"role": role, "message": msg}
+    # Only include metadata fields if they have content
+    if metadata.get("tool_calls"):
+        entry["tool_calls"] = metadata["tool_calls"]
+    if metadata.get("usage"):
+        entry["usage"] = metadata["usage"]
+    return entry
+
+
+def _index_entry(mtime_ns: int, agent: Agent) -> dict:
+    """Build the listing index entry for an agent.
+
+    Args:
+        mtime_ns: st_mtime_ns of the agent file the entry describes
+        agent: Agent to summarize
+
+    Returns:
+        Index entry with mtime_ns, description and capabilities
+    """
+    return {
+        "mtime_ns": mtime_ns,
+        "description": agent.description,
+        "capabilities": list(agent.capabilities),
+    }
+
+
 class AgentManager:
     """Manages agent storage, retrieval, and lifecycle operations."""
 
@@ -45,6 +128,19 @@ class AgentManager:
         self.agents_dir = base_path / "agents"
         self.history_dir = base_path / "history"
         self.config_file = base_path / "config.json"
+        # Name -> description/capabilities of each agent, for listings
+        self.index_file = base_path / "agent_index.json"
+        self._config: Optional[dict] = None  # Parsed config.json, loaded lazily
+        # st_mtime_ns of config_file when _config was read or written (None if absent)
+        self._config_mtime_ns: Optional[int] = None
+        # Loaded agents keyed by name, with the file's st_mtime_ns when cached
+        self._agent_cache: dict[str, tuple[int, Agent]] = {}
+        self._index: Optional[dict] = None  # Parsed index_file, loaded lazily
+        # Whether _index has changes that aren't in index_file yet
+        self._index_dirty = False
+        # Guards the caches, the index and config writes; tools may call the
+        # manager from several threads
+        self._lock = threading.RLock()
 
         # Ensure directories exist
         self.agents_dir.mkdir(parents=True, exist_ok=True)
@@ -63,13 +159,20 @@ class AgentManager:
             FileNotFoundError: If agent does not exist
         """
         agent_file = self.agents_dir / f"{name}.json"
-        if not agent_file.exists():
-            raise FileNotFoundError(f"Agent '{name}' not found")
+        try:
+            mtime_ns = os.stat(agent_file).st_mtime_ns
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Agent '{name}' not found") from None
 
-        with open(agent_file) as f:
-            data = json.load(f)
+        cached = self._agent_cache.get(name)
+        if cached is not None and cached[0] == mtime_ns:
+            agent = cached[1]
+        else:
+            agent = Agent.from_dict(_json.loads(agent_file.read_bytes()))
+            with self._lock:
+                self._agent_cache[name] = (mtime_ns, agent)
 
-        return Agent.from_dict(data)
+        return _copy_agent(agent)
 
     def save_agent(self, agent: Agent) -> None:
         """Save an agent to JSON file.
@@ -78,8 +181,18 @@ class AgentManager:
             agent: Agent instance to save
         """
         agent_file = self.agents_dir / f"{agent.name}.json"
-        with open(agent_file, 'w') as f:
-            json.dump(agent.to_dict(), f, indent=2)
+
+        with self._lock:
+            _write_json_atomic(agent_file, agent.to_dict(), indent=True)
+
+            mtime_ns = os.stat(agent_file).st_mtime_ns
+            self._agent_cache[agent.name] = (mtime_ns, _copy_agent(agent))
+
+            # Keep the in-memory index current, since a second save within the
+            # clock's granularity would leave the mtime unchanged; the file is
+            # written on the next listing rather than on every save
+            self._load_index()[agent.name] = _index_entry(mtime_ns, agent)
+            self._index_dirty = True
 
     def list_agents(self) -> list[str]:
         """List all available agent names.
@@ -87,7 +200,85 @@ class AgentManager:
         Returns:
             List of agent names (sorted)
         """
-        return sorted([f.stem for f in self.agents_dir.glob("*.json")])
+        with os.scandir(self.agents_dir) as entries:
+            names = [
+                entry.name[:-5]
+                for entry in entries
+                if entry.name.endswith(".json") and entry.is_file()
+            ]
+        names.sort()
+        return names
+
+    def agent_summaries(self) -> dict[str, Optional[tuple[str, list[str]]]]:
+        """Return each agent's description and capabilities for listings.
+
+        Summaries come from a small index file, so a listing costs one stat
+        per agent instead of opening and parsing every agent file. Entries
+        whose agent file changed since they were indexed are refreshed.
+
+        Returns:
+            Dictionary mapping agent names (sorted) to (description,
+            capabilities), or None for agents that cannot be read
+        """
+        with os.scandir(self.agents_dir) as entries:
+            mtimes = {
+                entry.name[:-5]: entry.stat().st_mtime_ns
+                for entry in entries
+                if entry.name.endswith(".json") and entry.is_file()
+            }
+
+        with self._lock:
+            index = self._load_index()
+
+            # Forget agents that were deleted
+            for name in index.keys() - mtimes.keys():
+                del index[name]
+                self._index_dirty = True
+
+            summaries: dict[str, Optional[tuple[str, list[str]]]] = {}
+            for name in sorted(mtimes):
+                entry = index.get(name)
+                if entry is None or entry["mtime_ns"] != mtimes[name]:
+                    try:
+                        agent = self.load_agent(name)
+                    except Exception:
+                        summaries[name] = None
+                        if index.pop(name, None) is not None:
+                            self._index_dirty = True
+                        continue
+                    entry = index[name] = _index_entry(mtimes[name], agent)
+                    self._index_dirty = True
+                summaries[name] = (entry["description"], entry["capabilities"])
+
+            if self._index_dirty:
+                self._write_index()
+
+        return summaries
+
+    def _load_index(self) -> dict:
+        """Return the parsed index file, reading it on first access.
+
+        Returns:
+            Index dictionary (empty if there is no readable index yet)
+        """
+        if self._index is None:
+            try:
+                index = _json.loads(self.index_file.read_bytes())
+            except FileNotFoundError:
+                index = {}
+            except _json.JSONDecodeError:
+                index = None
+            if not isinstance(index, dict):
+                # Unreadable or not an object; start over and rewrite it
+                index = {}
+                self._index_dirty = True
+            self._index = index
+        return self._index
+
+    def _write_index(self) -> None:
+        """Write the index file. Callers hold self._lock."""
+        _write_json_atomic(self.index_file, self._load_index())
+        self._index_dirty = False
 
     def agent_exists(self, name: str) -> bool:
         """Check if an agent exists.
@@ -98,7 +289,7 @@ class AgentManager:
         Returns:
             True if agent exists, False otherwise
         """
-        return (self.agents_dir / f"{name}.json").exists()
+        return os.path.isfile(self.agents_dir / f"{name}.json")
 
     def delete_agent(self, name: str) -> None:
         """Delete an agent and its history.
@@ -108,25 +299,46 @@ class AgentManager:
         """
         agent_file = self.agents_dir / f"{name}.json"
         history_file = self.history_dir / f"{name}.json"
+        with self._lock:
+            self._agent_cache.pop(name, None)
+            if self._load_index().pop(name, None) is not None:
+                self._index_dirty = True
 
         if agent_file.exists():
             agent_file.unlink()
         if history_file.exists():
             history_file.unlink()
 
+    def _load_config(self) -> dict:
+        """Return the parsed config file, re-reading it only when it changed.
+
+        Another process (the CLI or another web session) may update the file,
+        so the cached copy is trusted only while the file's mtime matches.
+
+        Returns:
+            Config dictionary (empty if no config file exists yet)
+        """
+        try:
+            mtime_ns: Optional[int] = os.stat(self.config_file).st_mtime_ns
+        except FileNotFoundError:
+            mtime_ns = None
+
+        if self._config is None or mtime_ns != self._config_mtime_ns:
+            try:
+                self._config = _json.loads(self.config_file.read_bytes())
+            except FileNotFoundError:
+                self._config = {}
+                mtime_ns = None
+            self._config_mtime_ns = mtime_ns
+        return self._config
+
     def get_last_agent(self) -> Optional[str]:
         """Get the name of the last used agent.
 
         Returns:
             Agent name or None if no last agent is set
         """
-        if not self.config_file.exists():
-            return None
-
-        with open(self.config_file) as f:
-            config = json.load(f)
-
-        return config.get("last_agent")
+        return self._load_config().get("last_agent")
 
     def set_last_agent(self, name: str) -> None:
         """Set the last used agent.
@@ -134,15 +346,15 @@ class AgentManager:
         Args:
             name: Name of agent to set as last used
         """
-        config = {}
-        if self.config_file.exists():
-            with open(self.config_file) as f:
-                config = json.load(f)
+        with self._lock:
+            config = self._load_config()
+            if config.get("last_agent") == name:
+                return
 
-        config["last_agent"] = name
+            config["last_agent"] = name
 
-        with open(self.config_file, 'w') as f:
-            json.dump(config, f, indent=2)
+            _write_json_atomic(self.config_file, config, indent=True)
+            self._config_mtime_ns = os.stat(self.config_file).st_mtime_ns
 
     def bootstrap(self) -> Agent:
         """Create the default agent-builder agent.
@@ -7,24 +7,26 @@ Each capability grants access to specific tools and adds to the system prompt.
 from __future__ import annotations
 
 from dataclasses import dataclass
+from functools import cache
+from types import MappingProxyType
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Capability:
     """Defines what a capability enables for an agent."""
 
     name: str
     description: str
-    tools: list[str]
+    tools: tuple[str, ...]
     system_prompt_addition: str
 
 
-# Registry of all available capabilities
-CAPABILITIES = {
+# Registry of all available capabilities (read-only)
+CAPABILITIES = MappingProxyType({
     "agent-creation": Capability(
         name="agent-creation",
         description="Create and modify agent definitions",
-        tools=["create_agent", "modify_agent", "delete_agent", "list_agents", "get_agent_details"],
+        tools=("create_agent", "modify_agent", "delete_agent", "list_agents", "get_agent_details"),
         system_prompt_addition=(
             "You can create new agents by specifying their name, description, and capabilities. "
             "New agents should have minimal capabilities by default - only add what they truly need. "
@@ -43,7 +45,7 @@ CAPABILITIES = {
     "file-operations": Capability(
         name="file-operations",
         description="Read and write files on the local system",
-        tools=["read_file", "write_file", "list_files", "delete_file"],
+        tools=("read_file", "write_file", "copy_file", "list_files", "delete_file"),
         system_prompt_addition=(
             "You can read and write files using the file operation tools. "
             "Always be careful when writing files - explain what you're doing and ask for confirmation "
@@ -53,7 +55,7 @@ CAPABILITIES = {
     "code-execution": Capability(
         name="code-execution",
         description="Execute Python and shell commands",
-        tools=["exec_python", "exec_shell"],
+        tools=("exec_python", "exec_shell"),
         system_prompt_addition=(
             "You can execute Python code and shell commands using the code execution tools. "
             "Always explain what code will do before executing it. "
@@ -63,10 +65,28 @@ CAPABILITIES = {
     "web-access": Capability(
         name="web-access",
         description="Search and fetch web content",
-        tools=["web_search", "web_fetch"],
+        tools=("web_search", "web_fetch"),
         system_prompt_addition=(
             "You can search the web and fetch content from URLs using the web access tools. "
             "This is useful for gathering information, researching topics, or checking documentation."
         )
     ),
-}
+})
+
+
+@cache
+def combined_prompt(names: tuple[str, ...]) -> str:
+    """Join the system prompt additions for a set of capabilities.
+
+    Results are cached per capability tuple since CAPABILITIES never changes.
+
+    Args:
+        names: Capability names in the order they should appear (unknown names are skipped)
+
+    Returns:
+        Prompt additions separated by blank lines
+    """
+    capabilities = (CAPABILITIES.get(name) for name in names)
+    return "\n\n".join(
+        capability.system_prompt_addition for capability in capabilities if capability is not None
+    )
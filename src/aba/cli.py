@@ -2,42 +2,71 @@
 
 from __future__ import annotations
 
-import argparse
-import json
 import sys
 from pathlib import Path
+from types import SimpleNamespace
+from typing import TYPE_CHECKING
 
-from .agent_manager import AgentManager
-from .runtime import AgentRuntime
+# Heavy modules are imported inside app() only on the paths that need them,
+# so management commands like --list never load the runtime or tools.
+if TYPE_CHECKING:  # pragma: no cover - static analysis only
+    import argparse
+
+    from .agent_manager import AgentManager
+
+# Flags handled by the fast argv parser: flag -> (destination, takes a value)
+_FLAGS = {
+    "--list": ("list", False),
+    "--import": ("import_file", True),
+    "--export": ("export", True),
+    "--delete": ("delete", True),
+    "--model": ("model", True),
+    "--no-history": ("no_history", False),
+    "--version": ("version", False),
+}
+
+
+def _version() -> str:
+    """Return the installed package version."""
+    from importlib.metadata import PackageNotFoundError, version
+
+    try:
+        return version("aba")
+    except PackageNotFoundError:
+        return "unknown"
 
 
 def _list_agents(manager: AgentManager) -> None:
     """List all available agents."""
-    agents = manager.list_agents()
+    # Descriptions come from the manager's index; unreadable agents map to None
+    summaries = manager.agent_summaries()
     last_agent = manager.get_last_agent()
 
-    if not agents:
+    if not summaries:
         print("No agents found.")
         return
 
-    print("Available agents:")
-    for name in sorted(agents):
+    # Build the listing first and write it once instead of printing per agent
+    lines = ["Available agents:"]
+    for name, summary in summaries.items():
         prefix = "*" if name == last_agent else " "
-        try:
-            agent = manager.load_agent(name)
-            caps = f"[{', '.join(agent.capabilities)}]" if agent.capabilities else "[chat only]"
-            print(f"{prefix} {name} - {agent.description} {caps}")
-        except Exception:
-            print(f"{prefix} {name}")
+        if summary is None:
+            lines.append(f"{prefix} {name}")
+            continue
+        description, capabilities = summary
+        caps = f"[{', '.join(capabilities)}]" if capabilities else "[chat only]"
+        lines.append(f"{prefix} {name} - {description} {caps}")
+
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 def _import_agent(manager: AgentManager, import_file: str) -> None:
     """Import an agent from JSON file."""
+    from . import _json
     from .agent import Agent
 
     try:
-        with open(import_file) as f:
-            data = json.load(f)
+        data = _json.loads(Path(import_file).read_bytes())
 
         agent = Agent.from_dict(data)
         manager.save_agent(agent)
@@ -52,14 +81,15 @@ def _import_agent(manager: AgentManager, import_file: str) -> None:
 
 def _export_agent(manager: AgentManager, agent_name: str, output_file: str = None) -> None:
     """Export an agent to JSON file."""
+    from . import _json
+
     try:
         agent = manager.load_agent(agent_name)
 
         if output_file is None:
             output_file = f"{agent_name}.json"
 
-        with open(output_file, 'w') as f:
-            json.dump(agent.to_dict(), f, indent=2)
+        Path(output_file).write_bytes(_json.dumps(agent.to_dict(), indent=True))
 
         print(f"✓ Exported agent '{agent_name}' to {output_file}")
     except FileNotFoundError:
@@ -70,8 +100,10 @@ def _export_agent(manager: AgentManager, agent_name: str, output_file: str = Non
         sys.exit(1)
 
 
-def app(argv: list[str] | None = None) -> None:
-    """Main CLI entry point."""
+def _build_parser() -> argparse.ArgumentParser:
+    """Build the full argparse parser (used for help and unusual input)."""
+    import argparse
+
     parser = argparse.ArgumentParser(
         description="Agent Builder - Run and manage AI agents",
         epilog="Examples:\n"
@@ -99,7 +131,68 @@ def app(argv: list[str] | None = None) -> None:
     parser.add_argument("--model", help="Override model for this session")
     parser.add_argument("--no-history", action="store_true", help="Don't load/save history")
 
-    args = parser.parse_args(argv)
+    parser.add_argument("--version", action="store_true", help="Show the version and exit")
+
+    return parser
+
+
+def _parse_args_fast(argv: list[str]) -> SimpleNamespace | None:
+    """Parse common invocations without importing argparse.
+
+    Only exact flags from _FLAGS and a single positional agent name are
+    handled. Anything else (help, abbreviations, --flag=value, missing
+    values) returns None so the caller falls back to argparse, which
+    prints the proper usage and error messages.
+
+    Args:
+        argv: Command line arguments, excluding the program name
+
+    Returns:
+        Parsed arguments, or None if argparse should handle them
+    """
+    args = {dest: None if takes_value else False for dest, takes_value in _FLAGS.values()}
+    args["agent"] = None
+
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        if arg.startswith("-"):
+            spec = _FLAGS.get(arg)
+            if spec is None:
+                return None
+            dest, takes_value = spec
+            if takes_value:
+                if i + 1 >= len(argv) or argv[i + 1].startswith("-"):
+                    return None
+                args[dest] = argv[i + 1]
+                i += 2
+                continue
+            args[dest] = True
+        elif args["agent"] is None:
+            args["agent"] = arg
+        else:
+            return None
+        i += 1
+
+    return SimpleNamespace(**args)
+
+
+def app(argv: list[str] | None = None) -> None:
+    """Main CLI entry point."""
+    if argv is None:
+        argv = sys.argv[1:]
+
+    args = _parse_args_fast(argv)
+    if args is None:
+        args = _build_parser().parse_args(argv)
+
+    # Answer --version before the manager touches the filesystem
+    if args.version:
+        print(f"aba {_version()}")
+        return
+
+    from .agent_manager import AgentManager
+
     manager = AgentManager()
 
     # Handle management commands
@@ -164,6 +257,8 @@ def app(argv: list[str] | None = None) -> None:
         agent.config["preserve_history"] = False
 
     # Run the agent
+    from .runtime import AgentRuntime
+
     try:
         runtime = AgentRuntime(agent, manager)
         runtime.run()
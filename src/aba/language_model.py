@@ -3,8 +3,54 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-import os
-from typing import Protocol
+from functools import lru_cache
+import re
+from typing import TYPE_CHECKING, Any, Protocol
+
+if TYPE_CHECKING:  # pragma: no cover - static analysis only
+    from ._openrouter import OpenRouterLanguageModel
+
+__all__ = ["LanguageModel", "RuleBasedLanguageModel", "OpenRouterLanguageModel"]
+
+# Keywords the rule-based model reacts to, matched case-insensitively in one pass
+_KEYWORD_RE = re.compile(r"tools|memory|plan|steps", re.IGNORECASE)
+
+
+@lru_cache(maxsize=256)
+def _rule_based_complete(prompt: str) -> str:
+    """Return the deterministic rule-based response for a prompt.
+
+    The response depends only on the prompt text, so repeated prompts are
+    served from the cache.
+
+    Args:
+        prompt: Text prompt to respond to
+
+    Returns:
+        Canned response assembled from the matched keywords
+    """
+    hits = {match.lower() for match in _KEYWORD_RE.findall(prompt)}
+    sentences: list[str] = []
+
+    if "tools" in hits:
+        sentences.append(
+            "Recommended tools include an HTTP client, JSON parser, and file operations."
+        )
+    if "memory" in hits:
+        sentences.append(
+            "A lightweight JSON file memory will preserve conversation history across runs."
+        )
+    if "plan" in hits or "steps" in hits:
+        sentences.append(
+            "Key steps: understand the goal, design modular components, and generate skeleton code."
+        )
+
+    if not sentences:
+        sentences.append(
+            "Focus on modular design, explicit interfaces, and testable components."
+        )
+
+    return " ".join(sentences)
 
 
 class LanguageModel(Protocol):
@@ -26,154 +72,13 @@ class RuleBasedLanguageModel:
     temperature: float = 0.0
 
     def complete(self, prompt: str) -> str:  # noqa: D401 - short description inherited
-        prompt_lower = prompt.lower()
-        sentences: list[str] = []
-
-        if "tools" in prompt_lower:
-            sentences.append(
-                "Recommended tools include an HTTP client, JSON parser, and file operations."
-            )
-        if "memory" in prompt_lower:
-            sentences.append(
-                "A lightweight JSON file memory will preserve conversation history across runs."
-            )
-        if "plan" in prompt_lower or "steps" in prompt_lower:
-            sentences.append(
-                "Key steps: understand the goal, design modular components, and generate skeleton code."
-            )
-
-        if not sentences:
-            sentences.append(
-                "Focus on modular design, explicit interfaces, and testable components."
-            )
-
-        return " ".join(sentences)
+        return _rule_based_complete(prompt)
 
 
-@dataclass
-class OpenRouterLanguageModel:
-    """Language model implementation backed by the OpenRouter API."""
-
-    model: str = "openai/gpt-4o-mini"
-    temperature: float = 0.7
-    api_key_env: str = "OPENROUTER_API_KEY"
-    base_url: str = "https://openrouter.ai/api/v1/chat/completions"
-    timeout: float = 30.0
-
-    def complete(self, prompt: str) -> str:  # noqa: D401 - protocol short description
-        """Legacy completion method (for backward compatibility).
-
-        Args:
-            prompt: Text prompt to send to the model
-
-        Returns:
-            Model's text response
-        """
-        try:
-            import requests
-        except ModuleNotFoundError as exc:  # pragma: no cover - dependency missing
-            raise RuntimeError(
-                "The 'requests' package is required to use OpenRouterLanguageModel. "
-                "Install it with 'pip install requests'."
-            ) from exc
-
-        api_key = os.getenv(self.api_key_env)
-        if not api_key:
-            raise RuntimeError(
-                "OpenRouter API key is required. Set the "
-                f"{self.api_key_env!r} environment variable."
-            )
-
-        response = requests.post(
-            self.base_url,
-            headers={
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json",
-                "HTTP-Referer": "https://github.com/anthropics/agent-building-agent",
-                "X-Title": "Agent Building Agent",
-            },
-            json={
-                "model": self.model,
-                "messages": [{"role": "user", "content": prompt}],
-                "temperature": self.temperature,
-            },
-            timeout=self.timeout,
-        )
-        response.raise_for_status()
-
-        payload = response.json()
-        try:
-            content = payload["choices"][0]["message"]["content"]
-        except (KeyError, IndexError, TypeError) as exc:  # pragma: no cover - defensive
-            raise RuntimeError("Unexpected response payload from OpenRouter") from exc
-
-        if not isinstance(content, str):  # pragma: no cover - defensive
-            raise RuntimeError("OpenRouter response did not include text content")
-
-        return content.strip()
-
-    def chat(
-        self,
-        messages: list[dict],
-        tools: list[dict] | None = None
-    ) -> tuple[dict, dict]:
-        """Chat with function calling support.
-
-        Args:
-            messages: List of message dictionaries with 'role' and 'content' keys
-            tools: Optional list of tool definitions for function calling
-
-        Returns:
-            Tuple of (message dict, usage dict) where:
-            - message: Raw API response containing message and/or tool_calls
-            - usage: Token usage stats (prompt_tokens, completion_tokens, total_tokens)
-        """
-        try:
-            import requests
-        except ModuleNotFoundError as exc:  # pragma: no cover - dependency missing
-            raise RuntimeError(
-                "The 'requests' package is required to use OpenRouterLanguageModel. "
-                "Install it with 'pip install requests'."
-            ) from exc
-
-        api_key = os.getenv(self.api_key_env)
-        if not api_key:
-            raise RuntimeError(
-                "OpenRouter API key is required. Set the "
-                f"{self.api_key_env!r} environment variable."
-            )
-
-        request_body = {
-            "model": self.model,
-            "messages": messages,
-            "temperature": self.temperature,
-        }
-
-        if tools:
-            request_body["tools"] = tools
-            request_body["tool_choice"] = "auto"
-
-        response = requests.post(
-            self.base_url,
-            headers={
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json",
-                "HTTP-Referer": "https://github.com/anthropics/agent-building-agent",
-                "X-Title": "Agent Building Agent",
-            },
-            json=request_body,
-            timeout=self.timeout,
-        )
-        response.raise_for_status()
-
-        payload = response.json()
-        try:
-            message = payload["choices"][0]["message"]
-            usage = payload.get("usage", {
-                "prompt_tokens": 0,
-                "completion_tokens": 0,
-                "total_tokens": 0
-            })
-            return message, usage
-        except (KeyError, IndexError, TypeError) as exc:  # pragma: no cover - defensive
-            raise RuntimeError("Unexpected response payload from OpenRouter") from exc
+def __getattr__(name: str) -> Any:
+    """Resolve OpenRouterLanguageModel from aba._openrouter on first access."""
+    if name == "OpenRouterLanguageModel":
+        from ._openrouter import OpenRouterLanguageModel
+
+        return OpenRouterLanguageModel
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -2,16 +2,45 @@
 
 from __future__ import annotations
 
-import json
+import sys
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Callable
+from typing import Any, Callable
 
+from . import _json
 from .agent import Agent
-from .agent_manager import AgentManager
-from .capabilities import CAPABILITIES
+from .agent_manager import AgentManager, _history_entry, _write_json_atomic
+from .capabilities import combined_prompt
 from .language_model import OpenRouterLanguageModel
 from .tool_schema import ToolSchema
-from .tools import TOOL_SCHEMAS
+from .tools import _CONTEXT_LIMITS, CAPABILITY_TOOL_SCHEMAS, TOOL_SCHEMAS
+
+# Chat commands that end the session (compared case-insensitively)
+_EXIT_COMMANDS = frozenset({"/exit", "/quit"})
+
+# Completed turns between history saves during a session (it is also saved on exit)
+_SAVE_EVERY_TURNS = 5
+
+# Longest string argument value shown (and recorded) for a tool call
+_DISPLAY_ARG_LIMIT = 200
+
+# Number of most recent history entries sent to the model (10 exchanges)
+_HISTORY_WINDOW = 20
+
+
+def _truncate_display_value(value: Any) -> Any:
+    """Shorten long string argument values for display.
+
+    Args:
+        value: Tool argument value
+
+    Returns:
+        The value, with strings over _DISPLAY_ARG_LIMIT characters truncated
+    """
+    if isinstance(value, str) and len(value) > _DISPLAY_ARG_LIMIT:
+        return value[:_DISPLAY_ARG_LIMIT] + "…"
+    return value
 
 
 class AgentRuntime:
@@ -27,7 +56,21 @@ class AgentRuntime:
         self.agent = agent
         self.manager = manager
         self.tool_schemas = self._load_tools()
+        # Tool definitions sent with every request; None when the agent has no tools
+        self._tools_array = self._build_tools_array() or None
+        # The system prompt is fixed for the session, so build its message once
+        system_prompt = self._build_system_prompt()
+        self._system_message = {"role": "system", "content": system_prompt} if system_prompt else None
         self.history = self._load_history()
+        # The last _HISTORY_WINDOW history entries as chat API messages, kept in
+        # step with self.history so each entry is formatted only once
+        self._window: deque[dict] = deque(maxlen=_HISTORY_WINDOW)
+        self._window_synced_len = 0
+        self._sync_window()
+        # Whether history has changed since it was last saved
+        self._history_dirty = False
+        # Whether tool call arguments are printed while tools run
+        self._verbose = agent.config.get("verbose_tools", True)
         self.model = self._create_model()
         self.current_usage = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
 
@@ -40,17 +83,12 @@ class AgentRuntime:
         tools = {}
 
         for capability_name in self.agent.capabilities:
-            if capability_name not in CAPABILITIES:
-                continue
-
-            capability = CAPABILITIES[capability_name]
-            for tool_name in capability.tools:
-                if tool_name in TOOL_SCHEMAS:
-                    tools[tool_name] = TOOL_SCHEMAS[tool_name]
+            tools.update(CAPABILITY_TOOL_SCHEMAS.get(capability_name, ()))
 
         # Always include get_context_info tool (informational, always safe)
-        if "get_context_info" in TOOL_SCHEMAS:
-            tools["get_context_info"] = TOOL_SCHEMAS["get_context_info"]
+        schema = TOOL_SCHEMAS.get("get_context_info")
+        if schema is not None:
+            tools["get_context_info"] = schema
 
         return tools
 
@@ -65,9 +103,9 @@ class AgentRuntime:
         if self.agent.system_prompt:
             parts.append(self.agent.system_prompt)
 
-        for cap_name in self.agent.capabilities:
-            if cap_name in CAPABILITIES:
-                parts.append(CAPABILITIES[cap_name].system_prompt_addition)
+        capability_prompt = combined_prompt(tuple(self.agent.capabilities))
+        if capability_prompt:
+            parts.append(capability_prompt)
 
         # Note: With function calling, tool descriptions are in the API request,
         # not the system prompt, so we don't need to list them here
@@ -106,19 +144,18 @@ class AgentRuntime:
         history_file = self.manager.history_dir / f"{self.agent.name}.json"
         if history_file.exists():
             try:
-                with open(history_file) as f:
-                    data = json.load(f)
-                    result = []
-                    for item in data:
-                        role = item["role"]
-                        message = item["message"]
-                        # Support both old and new formats
-                        metadata = {
-                            "tool_calls": item.get("tool_calls", []),
-                            "usage": item.get("usage", {})
-                        }
-                        result.append((role, message, metadata))
-                    return result
+                data = _json.loads(history_file.read_bytes())
+                result = []
+                for item in data:
+                    role = item["role"]
+                    message = item["message"]
+                    # Support both old and new formats
+                    metadata = {
+                        "tool_calls": item.get("tool_calls", []),
+                        "usage": item.get("usage", {})
+                    }
+                    result.append((role, message, metadata))
+                return result
             except Exception:
                 return []
 
@@ -130,18 +167,52 @@ class AgentRuntime:
             return
 
         history_file = self.manager.history_dir / f"{self.agent.name}.json"
-        data = []
-        for role, msg, metadata in self.history:
-            entry = {"role": role, "message": msg}
-            # Only include metadata fields if they have content
-            if metadata.get("tool_calls"):
-                entry["tool_calls"] = metadata["tool_calls"]
-            if metadata.get("usage"):
-                entry["usage"] = metadata["usage"]
-            data.append(entry)
-
-        with open(history_file, 'w') as f:
-            json.dump(data, f, indent=2)
+        data = [_history_entry(*item) for item in self.history]
+
+        # History is machine-read, so skip indentation; the atomic write never
+        # leaves a truncated history, even with a web session saving too
+        _write_json_atomic(history_file, data)
+        self._history_dirty = False
+
+    def _to_api_message(self, role: str, message: str, metadata: dict) -> dict:
+        """Convert a history entry to a chat API message.
+
+        Args:
+            role: History role ("user" or "agent")
+            message: Message text
+            metadata: Entry metadata with optional tool_calls
+
+        Returns:
+            Message dict with role and content keys
+        """
+        # For agent messages with tool calls, append tool summary to content
+        content = message
+        if role == "agent" and metadata.get("tool_calls"):
+            tool_summary = self._format_tool_calls_for_context(metadata["tool_calls"])
+            content = f"{message}\n\n{tool_summary}"
+
+        return {"role": "user" if role == "user" else "assistant", "content": content}
+
+    def _sync_window(self) -> None:
+        """Rebuild the API message window from the end of self.history."""
+        self._window.clear()
+        self._window.extend(
+            self._to_api_message(*entry) for entry in self.history[-_HISTORY_WINDOW:]
+        )
+        self._window_synced_len = len(self.history)
+
+    def _append_history(self, role: str, message: str, metadata: dict) -> None:
+        """Append an entry to the history and the API message window.
+
+        Args:
+            role: History role ("user" or "agent")
+            message: Message text
+            metadata: Entry metadata (tool_calls, usage)
+        """
+        self.history.append((role, message, metadata))
+        self._window.append(self._to_api_message(role, message, metadata))
+        self._window_synced_len = len(self.history)
+        self._history_dirty = True
 
     def _format_tool_calls_for_context(self, tool_calls: list[dict]) -> str:
         """Format tool calls for inclusion in LLM context.
@@ -190,6 +261,11 @@ class AgentRuntime:
         print("Type '/exit' or '/quit' to end the session.")
         print("Type '/help' for available commands.\n")
 
+        # Bind per-turn lookups once; /clear empties this same list in place
+        history = self.history
+        append_history = self._append_history
+        turns = 0
+
         while True:
             try:
                 user_input = input("> ").strip()
@@ -200,26 +276,25 @@ class AgentRuntime:
             if not user_input:
                 continue
 
-            if user_input.lower() in {"/exit", "/quit"}:
-                print("Exiting chat.")
-                break
-
             # Handle special commands
             if user_input.startswith("/"):
+                if user_input.casefold() in _EXIT_COMMANDS:
+                    print("Exiting chat.")
+                    break
                 self._handle_command(user_input)
                 continue
 
-            self.history.append(("user", user_input, {}))
+            append_history("user", user_input, {})
 
             try:
+                # The reply is printed as it streams in
                 response = self._generate_response(user_input)
-                print(f"{self.agent.name}: {response}\n")
                 # Add metadata with tool calls and usage
                 metadata = {
                     "tool_calls": getattr(self, '_current_tool_calls', []),
                     "usage": self.current_usage
                 }
-                self.history.append(("agent", response, metadata))
+                append_history("agent", response, metadata)
                 # Reset for next turn
                 self._current_tool_calls = []
 
@@ -227,9 +302,23 @@ class AgentRuntime:
                 self._display_usage_info()
             except Exception as exc:
                 print(f"Error contacting language model: {exc}")
-                self.history.pop()  # Remove user message on error
+                # Remove user message on error; the window may have evicted
+                # an older entry for it, so rebuild rather than pop
+                history.pop()
+                self._sync_window()
+                continue
 
-        self._save_history()
+            # Save periodically so a crash loses at most a few turns; history
+            # stays dirty if this fails, so the next save tries again
+            turns += 1
+            if turns % _SAVE_EVERY_TURNS == 0 and self._history_dirty:
+                try:
+                    self._save_history()
+                except OSError as exc:
+                    print(f"Error saving history: {exc}")
+
+        if self._history_dirty:
+            self._save_history()
         self.manager.set_last_agent(self.agent.name)
 
     def _handle_command(self, command: str) -> None:
@@ -261,11 +350,43 @@ class AgentRuntime:
                 print("No tools available (agent has no capabilities)")
         elif cmd == "/clear":
             self.history.clear()
+            self._sync_window()
+            self._history_dirty = True
             print("✓ History cleared.")
         else:
             print(f"Unknown command: {command}")
             print("Type '/help' for available commands.")
 
+    def _invoke_tool(self, tool_name: str, tool_args: dict) -> Any:
+        """Run one tool, turning failures into error strings.
+
+        Args:
+            tool_name: Name of the tool to run
+            tool_args: Parsed arguments from the model
+
+        Returns:
+            Tool result, or an "Error: ..." string
+        """
+        # Get tool schema
+        schema = self.tool_schemas.get(tool_name)
+        if schema is None:
+            return f"Error: Tool '{tool_name}' not found"
+
+        # Add _manager parameter for agent management tools
+        if schema.needs_manager:
+            tool_args["_manager"] = self.manager
+
+        # Add _runtime parameter for context info tools
+        if schema.needs_runtime:
+            tool_args["_runtime"] = self
+
+        try:
+            return schema.function(**tool_args)
+        except TypeError as e:
+            return f"Error: Invalid arguments: {e}"
+        except Exception as e:
+            return f"Error executing tool: {e}"
+
     def _display_usage_info(self) -> None:
         """Display token usage and warnings."""
         usage = self.current_usage
@@ -274,22 +395,8 @@ class AgentRuntime:
         if total_tokens == 0:
             return
 
-        # Model context window sizes
-        context_limits = {
-            "openai/gpt-4o": 128000,
-            "openai/gpt-4o-mini": 128000,
-            "openai/gpt-4-turbo": 128000,
-            "openai/gpt-3.5-turbo": 16385,
-            "anthropic/claude-3.5-sonnet": 200000,
-            "anthropic/claude-3-opus": 200000,
-            "anthropic/claude-3-sonnet": 200000,
-            "anthropic/claude-3-haiku": 200000,
-            "google/gemini-pro": 32768,
-            "meta-llama/llama-3-70b-instruct": 8192,
-        }
-
         model = self.agent.config.get("model", "openai/gpt-4o-mini")
-        context_limit = context_limits.get(model, 128000)
+        context_limit = _CONTEXT_LIMITS.get(model, 128000)
         usage_percent = (total_tokens / context_limit) * 100
 
         # Display usage
@@ -313,40 +420,29 @@ class AgentRuntime:
         # Track all tool calls in this response for history
         accumulated_tool_calls = []
 
-        # Build messages array for chat API
-        messages = []
+        # Build messages array for chat API, starting with the system prompt if present
+        messages = [self._system_message] if self._system_message else []
 
-        # Add system prompt if present
-        system_prompt = self._build_system_prompt()
-        if system_prompt:
-            messages.append({"role": "system", "content": system_prompt})
+        # History changed outside _append_history isn't in the window yet
+        if self._window_synced_len != len(self.history):
+            self._sync_window()
 
         # Add conversation history (last 10 exchanges to avoid context overflow)
-        for role, message, metadata in self.history[-20:]:
-            api_role = "user" if role == "user" else "assistant"
-
-            # For agent messages with tool calls, append tool summary to content
-            content = message
-            if role == "agent" and metadata.get("tool_calls"):
-                tool_summary = self._format_tool_calls_for_context(metadata["tool_calls"])
-                content = f"{message}\n\n{tool_summary}"
-
-            messages.append({"role": api_role, "content": content})
+        messages.extend(self._window)
 
         # Add current user input
         messages.append({"role": "user", "content": user_input})
 
-        # Build tools array
-        tools = self._build_tools_array() if self.tool_schemas else None
+        tools = self._tools_array
+        write = sys.stdout.write
+        flush = sys.stdout.flush
+        verbose = self._verbose
 
         # Tool execution loop
         max_iterations = 10  # Prevent infinite loops
         for iteration in range(max_iterations):
-            # Call LLM
-            response, usage = self.model.chat(messages, tools=tools)
-
-            # Update usage tracking
-            self.current_usage = usage
+            # Call LLM, printing its text as it streams in
+            response = self._stream_response(messages, tools)
 
             # Check if model wants to call tools
             tool_calls = response.get("tool_calls")
@@ -359,6 +455,7 @@ class AgentRuntime:
                 if content:
                     return content
                 else:
+                    write(f"{self.agent.name}: (No response from model)\n\n")
                     return "(No response from model)"
 
             # Model wants to call tools - add assistant message to history
@@ -368,53 +465,51 @@ class AgentRuntime:
                 "tool_calls": tool_calls
             })
 
-            # Execute each tool call
+            # Parse every call and announce it before anything runs
+            calls = []  # (tool_call_id, tool_name, display_args, tool_args or error string)
             for tool_call in tool_calls:
                 tool_name = tool_call["function"]["name"]
-                tool_args_str = tool_call["function"]["arguments"]
-                tool_call_id = tool_call["id"]
-
-                # Execute tool
                 try:
-                    # Parse arguments
-                    tool_args = json.loads(tool_args_str)
-
-                    # Show tool execution to user
-                    print(f"\n🔧 Calling tool: {tool_name}")
-                    # Show arguments (except _manager which is internal)
-                    display_args = {k: v for k, v in tool_args.items() if not k.startswith("_")}
-                    if display_args:
-                        print(f"   Arguments: {json.dumps(display_args, indent=6)}")
-
-                    # Get tool schema
-                    if tool_name not in self.tool_schemas:
-                        result = f"Error: Tool '{tool_name}' not found"
-                    else:
-                        schema = self.tool_schemas[tool_name]
-
-                        # Add _manager parameter for agent management tools
-                        if "_manager" in schema.function.__code__.co_varnames:
-                            tool_args["_manager"] = self.manager
-
-                        # Add _runtime parameter for context info tools
-                        if "_runtime" in schema.function.__code__.co_varnames:
-                            tool_args["_runtime"] = self
-
-                        # Call the tool
-                        result = schema.function(**tool_args)
-
-                    # Show result to user
-                    print(f"   Result: {result}\n")
-
-                except json.JSONDecodeError as e:
-                    result = f"Error: Invalid JSON arguments: {e}"
-                    print(f"   Result: {result}\n")
-                except TypeError as e:
-                    result = f"Error: Invalid arguments: {e}"
-                    print(f"   Result: {result}\n")
-                except Exception as e:
-                    result = f"Error executing tool: {e}"
-                    print(f"   Result: {result}\n")
+                    tool_args = _json.loads(tool_call["function"]["arguments"])
+                except _json.JSONDecodeError as e:
+                    calls.append((tool_call["id"], tool_name, {}, f"Error: Invalid JSON arguments: {e}"))
+                    continue
+                if not isinstance(tool_args, dict):
+                    calls.append((tool_call["id"], tool_name, {}, "Error: Invalid arguments: expected a JSON object"))
+                    continue
+
+                # Show tool execution to user (arguments exclude internal _params,
+                # and long values such as file contents are cut short)
+                display_args = {
+                    k: _truncate_display_value(v) for k, v in tool_args.items() if not k.startswith("_")
+                }
+                header = f"\n🔧 Calling tool: {tool_name}\n"
+                if verbose and display_args:
+                    header += f"   Arguments: {_json.dumps(display_args, indent=True).decode()}\n"
+                write(header)
+                calls.append((tool_call["id"], tool_name, display_args, tool_args))
+            flush()
+
+            # Run the tools. Calls may depend on earlier ones in the same message
+            # (write a file, then run it), so they run in order unless every
+            # tool in the batch only reads; those wait on files or HTTP and
+            # run concurrently
+            runnable = [(name, args) for _, name, _, args in calls if isinstance(args, dict)]
+            if len(runnable) > 1 and all(
+                name in self.tool_schemas and self.tool_schemas[name].parallel_safe
+                for name, _ in runnable
+            ):
+                with ThreadPoolExecutor(max_workers=min(8, len(runnable))) as pool:
+                    outputs = list(pool.map(self._invoke_tool, *zip(*runnable)))
+            else:
+                outputs = [self._invoke_tool(name, args) for name, args in runnable]
+            outputs = iter(outputs)
+
+            for tool_call_id, tool_name, display_args, tool_args in calls:
+                result = next(outputs) if isinstance(tool_args, dict) else tool_args
+
+                # Show result to user
+                write(f"   Result: {result}\n\n")
 
                 # Record tool call details for history
                 result_str = str(result)
@@ -430,11 +525,53 @@ class AgentRuntime:
                 messages.append({
                     "role": "tool",
                     "tool_call_id": tool_call_id,
-                    "content": str(result)
+                    "content": result_str
                 })
+            flush()
 
             # Continue loop to get next response
 
         # Max iterations reached - store tool calls even though we're erroring out
         self._current_tool_calls = accumulated_tool_calls
-        return "(Tool execution limit reached - please try a simpler request)"
+        message = "(Tool execution limit reached - please try a simpler request)"
+        write(f"{self.agent.name}: {message}\n\n")
+        return message
+
+    def _stream_response(self, messages: list[dict], tools: list[dict] | None) -> dict:
+        """Stream one model turn to stdout and collect it.
+
+        Text deltas are printed after the agent name as they arrive, so the
+        user sees the reply while the model is still generating it.
+
+        Args:
+            messages: Chat messages to send
+            tools: Tool definitions, or None
+
+        Returns:
+            Assistant message dict with 'content' (None if empty) and
+            'tool_calls' (None if the model called no tools)
+        """
+        write = sys.stdout.write
+        flush = sys.stdout.flush
+        parts = []
+        tool_calls = None
+
+        for event in self.model.chat_stream(messages, tools=tools):
+            kind = event["type"]
+            if kind == "content":
+                if not parts:
+                    write(f"{self.agent.name}: ")
+                parts.append(event["delta"])
+                write(event["delta"])
+                flush()
+            elif kind == "tool_calls":
+                tool_calls = event["calls"]
+            elif kind == "done":
+                # Update usage tracking
+                self.current_usage = event["usage"]
+
+        if parts:
+            write("\n\n")
+            flush()
+
+        return {"content": "".join(parts) or None, "tool_calls": tool_calls}
@@ -7,11 +7,42 @@ but adapted for OpenRouter's function calling API format.
 from __future__ import annotations
 
 import inspect
+import re
 from dataclasses import dataclass, field
+from types import MappingProxyType
 from typing import Any, Callable, get_type_hints
 
-
-@dataclass
+# Indented block following an "Args:" line, up to the next unindented line
+_ARGS_SECTION_RE = re.compile(r"^Args:[ \t]*\n(.*?)(?=^\S|\Z)", re.MULTILINE | re.DOTALL)
+# Start of one "name: description" entry within that block
+_ARG_NAME_RE = re.compile(r"^[ \t]+([^:\n]+?):", re.MULTILINE)
+
+# JSON schema type for each supported Python annotation, keyed by both the
+# type and its common lower-case string spellings
+_PY_TO_JSON = MappingProxyType({
+    str: "string", "str": "string", "string": "string",
+    int: "integer", "int": "integer", "integer": "integer",
+    float: "number", "float": "number", "number": "number",
+    bool: "boolean", "bool": "boolean", "boolean": "boolean",
+    list: "array", "list": "array", "array": "array",
+    dict: "object", "dict": "object", "object": "object",
+})
+
+# Fallback keyword scan for other string annotations, such as "Optional[int]"
+_JSON_TYPE_KEYWORDS = (
+    ("str", "string"),
+    ("int", "integer"),
+    ("float", "number"),
+    ("bool", "boolean"),
+    ("list", "array"),
+    ("array", "array"),
+)
+
+# Schemas created by @tool, grouped by the module that defines the function
+_REGISTERED: dict[str, list[ToolSchema]] = {}
+
+
+@dataclass(slots=True)
 class ToolParameter:
     """Parameter definition for a tool."""
 
@@ -21,7 +52,7 @@ class ToolParameter:
     required: bool = True
 
 
-@dataclass
+@dataclass(slots=True)
 class ToolSchema:
     """Schema for a tool compatible with OpenRouter function calling."""
 
@@ -29,6 +60,35 @@ class ToolSchema:
     description: str
     function: Callable
     parameters: list[ToolParameter] = field(default_factory=list)
+    # Whether the runtime must inject _manager / _runtime when calling the tool
+    needs_manager: bool = field(default=False, init=False, repr=False, compare=False)
+    needs_runtime: bool = field(default=False, init=False, repr=False, compare=False)
+    # Argument names shown to users, i.e. everything but the injected ones
+    public_params: tuple[str, ...] = field(default=(), init=False, repr=False, compare=False)
+    # Whether calls may run alongside other calls from the same model message;
+    # only tools that don't change state (files, agents, processes) should set it
+    parallel_safe: bool = field(default=False, compare=False)
+    # Built on first to_openrouter_format() call; parameters don't change after @tool
+    _openrouter_cache: dict[str, Any] | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self) -> None:
+        """Check once which internal and public parameters the function accepts."""
+        code = self.function.__code__
+        varnames = code.co_varnames
+        self.needs_manager = "_manager" in varnames
+        self.needs_runtime = "_runtime" in varnames
+        params = varnames[:code.co_argcount + code.co_kwonlyargcount]
+        self.public_params = tuple(p for p in params if not p.startswith("_"))
+
+    def __getattr__(self, name: str) -> Any:
+        """Fill in description and parameters for schemas created by @tool."""
+        # Only reached while the slot is still empty
+        if name in ("description", "parameters"):
+            self.description, self.parameters = _describe_function(self.function)
+            return getattr(self, name)
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
 
     def __call__(self, *args, **kwargs):
         """Make ToolSchema callable - delegates to the wrapped function."""
@@ -37,9 +97,14 @@ class ToolSchema:
     def to_openrouter_format(self) -> dict[str, Any]:
         """Convert to OpenRouter function calling format.
 
+        The result is built once and reused, so callers must not mutate it.
+
         Returns:
             Dictionary compatible with OpenRouter's tools parameter
         """
+        if self._openrouter_cache is not None:
+            return self._openrouter_cache
+
         # Build JSON schema for parameters
         properties = {}
         required = []
@@ -52,7 +117,7 @@ class ToolSchema:
             if param.required:
                 required.append(param.name)
 
-        return {
+        self._openrouter_cache = {
             "type": "function",
             "function": {
                 "name": self.name,
@@ -64,9 +129,10 @@ class ToolSchema:
                 }
             }
         }
+        return self._openrouter_cache
 
 
-def tool(func: Callable) -> ToolSchema:
+def tool(func: Callable | None = None, *, parallel_safe: bool = False) -> Any:
     """Decorator to convert a function into a tool with schema.
 
     Inspired by LangChain's @tool decorator, but outputs OpenRouter-compatible schema.
@@ -74,9 +140,12 @@ def tool(func: Callable) -> ToolSchema:
 
     Args:
         func: Function to convert to a tool
+        parallel_safe: Tool only reads state, so runtimes may run it at the
+            same time as other parallel-safe calls (use as @tool(parallel_safe=True))
 
     Returns:
-        ToolSchema object with function and metadata
+        ToolSchema object with function and metadata, or a decorator when
+        called with only keyword arguments
 
     Example:
         @tool
@@ -88,6 +157,42 @@ def tool(func: Callable) -> ToolSchema:
             '''
             return Path(path).read_text()
     """
+    if func is None:
+        return lambda f: tool(f, parallel_safe=parallel_safe)
+
+    # Description and parameters are derived on first access (see
+    # ToolSchema.__getattr__), so tools an agent never uses cost nothing at import
+    schema = ToolSchema.__new__(ToolSchema)
+    schema.name = func.__name__
+    schema.function = func
+    schema.parallel_safe = parallel_safe
+    schema._openrouter_cache = None
+    schema.__post_init__()
+    _REGISTERED.setdefault(func.__module__, []).append(schema)
+    return schema
+
+
+def registered_tools(module: str) -> tuple[ToolSchema, ...]:
+    """Return the tools defined with @tool in a module, in definition order.
+
+    Args:
+        module: Module name, usually the caller's __name__
+
+    Returns:
+        ToolSchema objects registered by that module
+    """
+    return tuple(_REGISTERED.get(module, ()))
+
+
+def _describe_function(func: Callable) -> tuple[str, list[ToolParameter]]:
+    """Extract a tool description and parameters from a function.
+
+    Args:
+        func: Function to inspect
+
+    Returns:
+        Tuple of (first docstring paragraph, parameter definitions)
+    """
     # Get function signature
     sig = inspect.signature(func)
     type_hints = get_type_hints(func)
@@ -122,12 +227,7 @@ def tool(func: Callable) -> ToolSchema:
             required=required
         ))
 
-    return ToolSchema(
-        name=func.__name__,
-        description=description,
-        function=func,
-        parameters=parameters
-    )
+    return description, parameters
 
 
 def _parse_docstring_args(docstring: str) -> dict[str, str]:
@@ -139,42 +239,18 @@ def _parse_docstring_args(docstring: str) -> dict[str, str]:
     Returns:
         Dictionary mapping parameter names to descriptions
     """
-    result = {}
-    lines = docstring.split("\n")
-
-    in_args = False
-    current_param = None
-    current_desc = []
+    section = _ARGS_SECTION_RE.search(docstring)
+    if section is None:
+        return {}
 
-    for line in lines:
-        stripped = line.strip()
-
-        if stripped == "Args:":
-            in_args = True
-            continue
+    block = section.group(1)
+    entries = list(_ARG_NAME_RE.finditer(block))
+    result = {}
 
-        if in_args:
-            # Check if we hit next section
-            if stripped.endswith(":") and not stripped.startswith(" "):
-                break
-
-            # Check if this is a parameter line (starts with word:)
-            if ":" in stripped and not stripped.startswith(" "):
-                # Save previous parameter
-                if current_param:
-                    result[current_param] = " ".join(current_desc).strip()
-
-                # Parse new parameter
-                parts = stripped.split(":", 1)
-                current_param = parts[0].strip()
-                current_desc = [parts[1].strip()] if len(parts) > 1 else []
-            elif current_param:
-                # Continuation of previous description
-                current_desc.append(stripped)
-
-    # Save last parameter
-    if current_param:
-        result[current_param] = " ".join(current_desc).strip()
+    # Each description runs from its "name:" up to the next entry
+    for entry, next_entry in zip(entries, entries[1:] + [None]):
+        end = next_entry.start() if next_entry else len(block)
+        result[entry.group(1).strip()] = " ".join(block[entry.end():end].split())
 
     return result
 
@@ -188,29 +264,15 @@ def _python_type_to_json_type(python_type: type) -> str:
     Returns:
         JSON schema type string
     """
-    # Handle string representations
-    if isinstance(python_type, str):
-        python_type_lower = python_type.lower()
-        if "str" in python_type_lower:
-            return "string"
-        if "int" in python_type_lower:
-            return "integer"
-        if "float" in python_type_lower:
-            return "number"
-        if "bool" in python_type_lower:
-            return "boolean"
-        if "list" in python_type_lower or "array" in python_type_lower:
-            return "array"
-        return "string"
-
-    # Handle actual types
-    type_map = {
-        str: "string",
-        int: "integer",
-        float: "number",
-        bool: "boolean",
-        list: "array",
-        dict: "object"
-    }
-
-    return type_map.get(python_type, "string")
+    is_string = isinstance(python_type, str)
+    key = python_type.strip().lower() if is_string else python_type
+
+    json_type = _PY_TO_JSON.get(key)
+    if json_type is not None or not is_string:
+        return json_type or "string"
+
+    # Uncommon string spellings: first keyword contained in the annotation wins
+    for keyword, json_type in _JSON_TYPE_KEYWORDS:
+        if keyword in key:
+            return json_type
+    return "string"
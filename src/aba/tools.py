@@ -6,14 +6,52 @@ Each capability grants access to specific tools.
 
 from __future__ import annotations
 
-import json
-import subprocess
+import mmap
+import os
+import re
+import shutil
+import sys
+from functools import lru_cache
 from pathlib import Path
-from typing import Any
+from types import MappingProxyType
+from typing import Any, Mapping
 
 from .agent import Agent
 from .agent_manager import AgentManager
-from .tool_schema import ToolSchema, tool
+from .capabilities import CAPABILITIES
+from .tool_schema import ToolSchema, registered_tools, tool
+
+# Seconds a code execution tool may run
+_EXEC_TIMEOUT = 10
+
+# Shell commands made only of these characters contain nothing for the shell
+# to interpret (no quotes, $, globs, redirection, pipes, ~ or ;)
+_PLAIN_COMMAND_RE = re.compile(r"[\w@%+=:,./ -]+", re.ASCII)
+
+# Files larger than this are memory-mapped by read_file
+_MMAP_THRESHOLD = 1 << 20
+
+# Entry markers in list_files output, and the same indexed by is_dir
+_DIR_PREFIX = "📁"
+_FILE_PREFIX = "📄"
+_ENTRY_PREFIXES = (_FILE_PREFIX, _DIR_PREFIX)
+
+# list_agents line prefixes, indexed by whether the agent was used last
+_LAST_AGENT_MARKS = (" ", "*")
+
+# Model context window sizes (in tokens), shared with the runtime's usage display
+_CONTEXT_LIMITS = MappingProxyType({
+    "openai/gpt-4o": 128000,
+    "openai/gpt-4o-mini": 128000,
+    "openai/gpt-4-turbo": 128000,
+    "openai/gpt-3.5-turbo": 16385,
+    "anthropic/claude-3.5-sonnet": 200000,
+    "anthropic/claude-3-opus": 200000,
+    "anthropic/claude-3-sonnet": 200000,
+    "anthropic/claude-3-haiku": 200000,
+    "google/gemini-pro": 32768,
+    "meta-llama/llama-3-70b-instruct": 8192,
+})
 
 
 @tool
@@ -114,7 +152,7 @@ def delete_agent(name: str, _manager: AgentManager | None = None) -> str:
     return f"✓ Deleted agent '{name}'"
 
 
-@tool
+@tool(parallel_safe=True)
 def list_agents(_manager: AgentManager | None = None) -> str:
     """List all available agents.
 
@@ -125,27 +163,39 @@ def list_agents(_manager: AgentManager | None = None) -> str:
         Formatted list of agents
     """
     manager = _manager or AgentManager()
-    agents = manager.list_agents()
+    # Descriptions come from the manager's index; unreadable agents map to None
+    summaries = manager.agent_summaries()
 
-    if not agents:
+    if not summaries:
         return "No agents found."
 
     last_agent = manager.get_last_agent()
-    lines = ["Available agents:"]
+    return "Available agents:\n" + "\n".join(
+        _agent_summary(name, summary, name == last_agent) for name, summary in summaries.items()
+    )
 
-    for name in agents:
-        prefix = "*" if name == last_agent else " "
-        try:
-            agent = manager.load_agent(name)
-            caps = f"[{', '.join(agent.capabilities)}]" if agent.capabilities else "[chat only]"
-            lines.append(f"{prefix} {name} - {agent.description} {caps}")
-        except Exception:
-            lines.append(f"{prefix} {name}")
 
-    return "\n".join(lines)
+def _agent_summary(name: str, summary: tuple[str, list[str]] | None, is_last: bool) -> str:
+    """Format one line of the list_agents output.
 
+    Args:
+        name: Agent name
+        summary: (description, capabilities), or None if the agent could not be read
+        is_last: Whether this was the most recently used agent
 
-@tool
+    Returns:
+        "name - description [capabilities]", or just the name if the agent
+        could not be read, marked with "*" if it was used last
+    """
+    prefix = _LAST_AGENT_MARKS[is_last]
+    if summary is None:
+        return f"{prefix} {name}"
+    description, capabilities = summary
+    caps = f"[{', '.join(capabilities)}]" if capabilities else "[chat only]"
+    return f"{prefix} {name} - {description} {caps}"
+
+
+@tool(parallel_safe=True)
 def get_agent_details(name: str, _manager: AgentManager | None = None) -> str:
     """Get detailed information about a specific agent.
 
@@ -165,49 +215,58 @@ def get_agent_details(name: str, _manager: AgentManager | None = None) -> str:
     except Exception as e:
         return f"Error loading agent '{name}': {e}"
 
-    lines = [
-        f"Agent: {agent.name}",
-        f"Description: {agent.description}",
-        f"Created: {agent.created}",
-        f"Last used: {agent.last_used}",
-        f"Version: {agent.version}",
-        "",
-        "Capabilities:",
-    ]
-
     if agent.capabilities:
-        for cap in agent.capabilities:
-            lines.append(f"  - {cap}")
+        capabilities = "\n".join(f"  - {cap}" for cap in agent.capabilities)
     else:
-        lines.append("  (none - chat only)")
+        capabilities = "  (none - chat only)"
 
-    lines.append("")
-    lines.append("Configuration:")
     if agent.config:
-        for key, value in agent.config.items():
-            lines.append(f"  {key}: {value}")
+        config = "\n".join(f"  {key}: {value}" for key, value in agent.config.items())
     else:
-        lines.append("  (using defaults)")
+        config = "  (using defaults)"
+
+    details = (
+        f"Agent: {agent.name}\n"
+        f"Description: {agent.description}\n"
+        f"Created: {agent.created}\n"
+        f"Last used: {agent.last_used}\n"
+        f"Version: {agent.version}\n"
+        f"\n"
+        f"Capabilities:\n{capabilities}\n"
+        f"\n"
+        f"Configuration:\n{config}"
+    )
 
     if agent.system_prompt:
-        lines.append("")
-        lines.append("System Prompt:")
         # Truncate long prompts
         prompt_preview = agent.system_prompt[:200]
         if len(agent.system_prompt) > 200:
             prompt_preview += "..."
-        lines.append(f"  {prompt_preview}")
+        details += f"\n\nSystem Prompt:\n  {prompt_preview}"
 
     if agent.metadata:
-        lines.append("")
-        lines.append("Metadata:")
-        for key, value in agent.metadata.items():
-            lines.append(f"  {key}: {value}")
+        metadata = "\n".join(f"  {key}: {value}" for key, value in agent.metadata.items())
+        details += f"\n\nMetadata:\n{metadata}"
 
-    return "\n".join(lines)
+    return details
 
 
-@tool
+def _decode_text(data: bytes | mmap.mmap) -> str:
+    """Decode file bytes the way text-mode open() would.
+
+    Args:
+        data: Raw file contents (any bytes-like object)
+
+    Returns:
+        UTF-8 decoded text with CRLF and CR line endings turned into LF
+    """
+    text = str(data, "utf-8")
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
+@tool(parallel_safe=True)
 def read_file(path: str) -> str:
     """Read contents of a text file.
 
@@ -218,7 +277,15 @@ def read_file(path: str) -> str:
         File contents as text, or error message if file not found
     """
     try:
-        return Path(path).read_text()
+        # An unbuffered FileIO reads the whole file in one readall(), sized from
+        # fstat, without open()'s buffered and text layers; decode once after
+        with open(path, "rb", buffering=0) as f:
+            if os.fstat(f.fileno()).st_size > _MMAP_THRESHOLD:
+                # Decode large files straight from a memory map, skipping the
+                # copy into a bytes object
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    return _decode_text(mapped)
+            return _decode_text(f.readall())
     except FileNotFoundError:
         return f"Error: File '{path}' not found"
     except Exception as e:
@@ -237,13 +304,46 @@ def write_file(path: str, content: str) -> str:
         Success message with number of bytes written
     """
     try:
-        Path(path).write_text(content)
-        return f"✓ Wrote {len(content)} bytes to {path}"
+        data = content.encode("utf-8")
+        with open(path, "wb", buffering=0) as f:
+            # Raw writes may be partial, so write until everything is out
+            view = memoryview(data)
+            while view:
+                view = view[f.write(view):]
+        return f"✓ Wrote {len(data)} bytes to {path}"
     except Exception as e:
         return f"Error writing file: {e}"
 
 
 @tool
+def copy_file(source: str, destination: str) -> str:
+    """Copy a file's contents to another path, creating or overwriting it.
+
+    Use this instead of read_file followed by write_file when the content is
+    unchanged; the data never has to pass through the conversation.
+
+    Args:
+        source: Path to the file to copy
+        destination: Path to write the copy to
+
+    Returns:
+        Success message with number of bytes copied
+    """
+    try:
+        # copyfile hands the transfer to the kernel (copy_file_range/sendfile
+        # on Linux, fcopyfile on macOS) where available
+        shutil.copyfile(source, destination)
+        return f"✓ Copied {os.path.getsize(destination)} bytes from {source} to {destination}"
+    except FileNotFoundError as e:
+        # The destination's directory may be the missing path instead
+        if e.filename == source:
+            return f"Error: File '{source}' not found"
+        return f"Error copying file: {e}"
+    except Exception as e:
+        return f"Error copying file: {e}"
+
+
+@tool(parallel_safe=True)
 def list_files(path: str = ".") -> str:
     """List files in a directory.
 
@@ -251,26 +351,46 @@ def list_files(path: str = ".") -> str:
         path: Directory path (default: current directory)
 
     Returns:
-        Formatted list of files
+        Formatted list of files, with sizes for regular files
     """
     try:
-        dir_path = Path(path)
-        if not dir_path.exists():
-            return f"Error: Directory '{path}' not found"
+        # scandir reports each entry's type from the directory listing itself,
+        # so only symlinks need an extra stat to tell files from directories;
+        # sizes come from the entry's own cached stat, never a second Path.stat
+        with os.scandir(path) as it:
+            entries = sorted((entry.name, entry.is_dir(), _entry_size(entry)) for entry in it)
+    except FileNotFoundError:
+        return f"Error: Directory '{path}' not found"
+    except NotADirectoryError:
+        return f"Error: '{path}' is not a directory"
+    except Exception as e:
+        return f"Error listing files: {e}"
 
-        if not dir_path.is_dir():
-            return f"Error: '{path}' is not a directory"
+    lines = [f"Contents of {path}:"]
+    for name, is_dir, size in entries:
+        # Directories never have a size
+        line = f"{_ENTRY_PREFIXES[is_dir]} {name}"
+        lines.append(line if size is None else f"{line} ({size:,} bytes)")
 
-        files = sorted(dir_path.iterdir(), key=lambda p: p.name)
-        lines = [f"Contents of {path}:"]
+    return "\n".join(lines)
 
-        for file in files:
-            prefix = "📁" if file.is_dir() else "📄"
-            lines.append(f"{prefix} {file.name}")
 
-        return "\n".join(lines)
-    except Exception as e:
-        return f"Error listing files: {e}"
+def _entry_size(entry: os.DirEntry) -> int | None:
+    """Return the size of a file entry for list_files.
+
+    Args:
+        entry: Directory entry from os.scandir
+
+    Returns:
+        Size in bytes of the file (or the file a symlink points to), or None
+        for directories and entries that cannot be stat'ed, such as broken links
+    """
+    try:
+        if entry.is_dir():
+            return None
+        return entry.stat().st_size
+    except OSError:
+        return None
 
 
 @tool
@@ -296,25 +416,35 @@ def delete_file(path: str) -> str:
 
 @tool
 def exec_python(code: str) -> str:
-    """Execute Python code in an isolated subprocess with 10-second timeout.
+    """Execute Python code in a separate process with 10-second timeout.
 
     Args:
-        code: Python code to execute (runs in fresh subprocess, no state persistence)
+        code: Python code to execute (runs in a fresh namespace, no state persistence)
 
     Returns:
         Standard output and errors from the code execution
     """
-    try:
-        result = subprocess.run(
-            ["python", "-c", code],
-            capture_output=True,
-            text=True,
-            timeout=10
-        )
+    # Imported here so loading the tools module doesn't pay for subprocess
+    import subprocess
 
-        output = result.stdout
-        if result.stderr:
-            output += f"\nErrors:\n{result.stderr}"
+    from . import _python_worker
+
+    try:
+        if os.name == "posix":
+            # Run on a warm interpreter to skip startup; if none can be
+            # started, fall back to a one-off process
+            try:
+                stdout, stderr = _python_worker.run_snippet(code, _EXEC_TIMEOUT)
+            except _python_worker.WorkerDied as e:
+                return f"Error: Python process exited unexpectedly ({e})"
+            except OSError:
+                stdout, stderr = _run_python_process(code)
+        else:
+            stdout, stderr = _run_python_process(code)
+
+        output = stdout
+        if stderr:
+            output += f"\nErrors:\n{stderr}"
 
         return output or "✓ Code executed (no output)"
     except subprocess.TimeoutExpired:
@@ -323,6 +453,29 @@ def exec_python(code: str) -> str:
         return f"Error executing Python code: {e}"
 
 
+def _run_python_process(code: str) -> tuple[str, str]:
+    """Run code in a new interpreter process.
+
+    Args:
+        code: Python code to execute
+
+    Returns:
+        Tuple of (stdout, stderr) text
+
+    Raises:
+        subprocess.TimeoutExpired: If the code runs longer than _EXEC_TIMEOUT
+    """
+    import subprocess
+
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        timeout=_EXEC_TIMEOUT
+    )
+    return result.stdout, result.stderr
+
+
 @tool
 def exec_shell(command: str) -> str:
     """Execute a shell command with 10-second timeout.
@@ -333,14 +486,30 @@ def exec_shell(command: str) -> str:
     Returns:
         Standard output and errors from the command execution
     """
+    # Imported here so loading the tools module doesn't pay for subprocess
+    import subprocess
+
     try:
-        result = subprocess.run(
-            command,
-            shell=True,
-            capture_output=True,
-            text=True,
-            timeout=10
-        )
+        argv, executable = _plain_command(command)
+        if argv:
+            # Nothing for a shell to interpret, so run the program directly;
+            # without close_fds this can use posix_spawn instead of fork+exec
+            result = subprocess.run(
+                argv,
+                executable=executable,
+                close_fds=False,
+                capture_output=True,
+                text=True,
+                timeout=_EXEC_TIMEOUT
+            )
+        else:
+            result = subprocess.run(
+                command,
+                shell=True,
+                capture_output=True,
+                text=True,
+                timeout=_EXEC_TIMEOUT
+            )
 
         output = result.stdout
         if result.stderr:
@@ -353,7 +522,30 @@ def exec_shell(command: str) -> str:
         return f"Error executing shell command: {e}"
 
 
-@tool
+def _plain_command(command: str) -> tuple[list[str], str | None]:
+    """Split a command that needs no shell features into argv.
+
+    Args:
+        command: Shell command line
+
+    Returns:
+        Tuple of (argv, resolved executable path), or ([], None) when the
+        command needs a shell: quoting, expansion, redirection, pipes,
+        variable assignments, or a name that is not a program on PATH
+        (such as the cd builtin)
+    """
+    if os.name != "posix" or not _PLAIN_COMMAND_RE.fullmatch(command):
+        return [], None
+    argv = command.split()
+    if not argv or "=" in argv[0]:
+        return [], None
+    executable = shutil.which(argv[0])
+    if executable is None:
+        return [], None
+    return argv, executable
+
+
+@tool(parallel_safe=True)
 def web_search(query: str) -> str:
     """Search the web for information (NOT YET IMPLEMENTED).
 
@@ -366,7 +558,7 @@ def web_search(query: str) -> str:
     return f"[Web search not yet implemented for query: {query}]\nThis tool requires implementation with a search API."
 
 
-@tool
+@tool(parallel_safe=True)
 def web_fetch(url: str) -> str:
     """Fetch content from a URL (NOT YET IMPLEMENTED).
 
@@ -379,7 +571,7 @@ def web_fetch(url: str) -> str:
     return f"[Web fetch not yet implemented for URL: {url}]\nThis tool requires implementation with an HTTP client."
 
 
-@tool
+@tool(parallel_safe=True)
 def get_context_info(_runtime: Any = None) -> str:
     """Get information about current context window usage.
 
@@ -395,22 +587,7 @@ def get_context_info(_runtime: Any = None) -> str:
     # Get usage stats
     usage = _runtime.current_usage
     model = _runtime.agent.config.get("model", "openai/gpt-4o-mini")
-
-    # Model context window sizes (in tokens)
-    context_limits = {
-        "openai/gpt-4o": 128000,
-        "openai/gpt-4o-mini": 128000,
-        "openai/gpt-4-turbo": 128000,
-        "openai/gpt-3.5-turbo": 16385,
-        "anthropic/claude-3.5-sonnet": 200000,
-        "anthropic/claude-3-opus": 200000,
-        "anthropic/claude-3-sonnet": 200000,
-        "anthropic/claude-3-haiku": 200000,
-        "google/gemini-pro": 32768,
-        "meta-llama/llama-3-70b-instruct": 8192,
-    }
-
-    context_limit = context_limits.get(model, 128000)  # Default to 128k
+    context_limit = _CONTEXT_LIMITS.get(model, 128000)  # Default to 128k
 
     prompt_tokens = usage.get("prompt_tokens", 0)
     completion_tokens = usage.get("completion_tokens", 0)
@@ -419,40 +596,47 @@ def get_context_info(_runtime: Any = None) -> str:
     if total_tokens > 0:
         usage_percent = (total_tokens / context_limit) * 100
 
-        lines = [
-            f"Context Window Usage:",
-            f"  Model: {model}",
-            f"  Context limit: {context_limit:,} tokens",
-            f"  Prompt tokens: {prompt_tokens:,}",
-            f"  Completion tokens: {completion_tokens:,}",
-            f"  Total tokens: {total_tokens:,}",
-            f"  Usage: {usage_percent:.1f}%",
+        return (
+            f"{_context_header(model, context_limit)}\n"
+            f"  Prompt tokens: {prompt_tokens:,}\n"
+            f"  Completion tokens: {completion_tokens:,}\n"
+            f"  Total tokens: {total_tokens:,}\n"
+            f"  Usage: {usage_percent:.1f}%\n"
             f"  Remaining: {context_limit - total_tokens:,} tokens"
-        ]
-
-        return "\n".join(lines)
+        )
     else:
         return f"No usage data available yet.\nModel: {model}\nContext limit: {context_limit:,} tokens"
 
 
+@lru_cache(maxsize=16)
+def _context_header(model: str, context_limit: int) -> str:
+    """Return the model-dependent opening lines of get_context_info's report.
+
+    Args:
+        model: Model ID
+        context_limit: Model's context window in tokens
+
+    Returns:
+        Report title, model and context limit lines
+    """
+    return f"Context Window Usage:\n  Model: {model}\n  Context limit: {context_limit:,} tokens"
+
+
 # Tool schemas (decorated functions return ToolSchema objects)
 # These contain both the function AND the schema for function calling
-TOOL_SCHEMAS: dict[str, ToolSchema] = {
-    "create_agent": create_agent,
-    "modify_agent": modify_agent,
-    "delete_agent": delete_agent,
-    "list_agents": list_agents,
-    "get_agent_details": get_agent_details,
-    "read_file": read_file,
-    "write_file": write_file,
-    "list_files": list_files,
-    "delete_file": delete_file,
-    "exec_python": exec_python,
-    "exec_shell": exec_shell,
-    "web_search": web_search,
-    "web_fetch": web_fetch,
-    "get_context_info": get_context_info,
-}
+# Every @tool above, in definition order
+TOOL_SCHEMAS: dict[str, ToolSchema] = {schema.name: schema for schema in registered_tools(__name__)}
+
+# (tool name, schema) pairs granted by each capability, resolved once so
+# runtimes load an agent's tools with one dict.update per capability
+CAPABILITY_TOOL_SCHEMAS: Mapping[str, tuple[tuple[str, ToolSchema], ...]] = MappingProxyType({
+    capability_name: tuple(
+        (tool_name, TOOL_SCHEMAS[tool_name])
+        for tool_name in capability.tools
+        if tool_name in TOOL_SCHEMAS
+    )
+    for capability_name, capability in CAPABILITIES.items()
+})
 
 # Tool registry maps tool names to functions (for backward compatibility)
 TOOL_REGISTRY = {
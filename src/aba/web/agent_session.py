@@ -3,22 +3,41 @@
 from __future__ import annotations
 
 import asyncio
-import json
 import logging
+from collections import deque
+from contextlib import aclosing
+from dataclasses import asdict
 from pathlib import Path
-from typing import Any
-
-from fastapi import WebSocket
+from typing import TYPE_CHECKING, Any
 
+from .. import _json
 from ..agent import Agent
-from ..agent_manager import AgentManager
-from ..capabilities import CAPABILITIES
+from ..agent_manager import AgentManager, _history_entry, _write_json_atomic
+from ..capabilities import combined_prompt
 from ..tool_schema import ToolSchema
-from ..tools import TOOL_SCHEMAS
-from .streaming_model import StreamingOpenRouterModel
+from ..tools import CAPABILITY_TOOL_SCHEMAS, TOOL_SCHEMAS
+from .messages import ToolResult, ToolStart
+
+# The session only annotates with WebSocket, and the model (which needs httpx)
+# is created in _create_model, so the module imports without the web extras
+if TYPE_CHECKING:  # pragma: no cover - static analysis only
+    from fastapi import WebSocket
+
+    from .streaming_model import StreamingOpenRouterModel
 
 logger = logging.getLogger(__name__)
 
+# Streamed content deltas are coalesced into one stream_chunk frame, sent once
+# this many characters are buffered or this many seconds after the first
+# buffered delta, so fast models don't cost one serialize and send per token
+_DELTA_FLUSH_CHARS = 256
+_DELTA_FLUSH_INTERVAL = 0.02
+# Constant parts of an in-progress stream_chunk frame; only content varies
+_STREAM_CHUNK_PREFIX = b'{"type":"stream_chunk","content":'
+_STREAM_CHUNK_SUFFIX = b',"is_complete":false}'
+# History entries sent to the model (last 10 exchanges = 20 messages)
+_HISTORY_WINDOW = 20
+
 
 class AgentSession:
     """Manages a single agent chat session over WebSocket.
@@ -45,10 +64,37 @@ class AgentSession:
         self.manager = manager
         self.websocket = websocket
         self.tool_schemas = self._load_tools()
-        self.history = self._load_history()
+        # Tool definitions sent with every request; None when the agent has no tools
+        self._tools_array = self._build_tools_array() or None
+        # The system prompt is fixed for the session, so build its message once
+        system_prompt = self._build_system_prompt()
+        self._system_message = {"role": "system", "content": system_prompt} if system_prompt else None
+        # Loaded off the event loop by start()
+        self.history: list[tuple[str, str, dict]] = []
+        # The last _HISTORY_WINDOW history entries as chat API messages, kept in
+        # step with self.history so each entry is formatted only once
+        self._window: deque[dict] = deque(maxlen=_HISTORY_WINDOW)
         self.model = self._create_model()
         self.current_usage = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
-        logger.info(f"Session initialized with {len(self.tool_schemas)} tools, {len(self.history)} history items")
+        self._pending_deltas: list[str] = []
+        self._pending_chars = 0
+        # Timer that flushes buffered deltas, and the flush task it started
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._flush_task: asyncio.Task | None = None
+        # Held while a frame is sent, so a timed flush and the session's own
+        # sends go out in the order they were started
+        self._send_lock = asyncio.Lock()
+        # Set once a send fails; later sends are skipped and generation stops
+        self._closed = False
+        logger.info(f"Session initialized with {len(self.tool_schemas)} tools")
+
+    async def start(self) -> None:
+        """Load saved history in a worker thread so other sessions keep running."""
+        self.history = await asyncio.to_thread(self._load_history)
+        self._window.extend(
+            self._to_api_message(*item) for item in self.history[-_HISTORY_WINDOW:]
+        )
+        logger.info(f"Loaded {len(self.history)} history items")
 
     def _load_tools(self) -> dict[str, ToolSchema]:
         """Load tool schemas based on agent capabilities.
@@ -59,17 +105,12 @@ class AgentSession:
         tools = {}
 
         for capability_name in self.agent.capabilities:
-            if capability_name not in CAPABILITIES:
-                continue
-
-            capability = CAPABILITIES[capability_name]
-            for tool_name in capability.tools:
-                if tool_name in TOOL_SCHEMAS:
-                    tools[tool_name] = TOOL_SCHEMAS[tool_name]
+            tools.update(CAPABILITY_TOOL_SCHEMAS.get(capability_name, ()))
 
         # Always include get_context_info
-        if "get_context_info" in TOOL_SCHEMAS:
-            tools["get_context_info"] = TOOL_SCHEMAS["get_context_info"]
+        schema = TOOL_SCHEMAS.get("get_context_info")
+        if schema is not None:
+            tools["get_context_info"] = schema
 
         return tools
 
@@ -79,6 +120,8 @@ class AgentSession:
         Returns:
             Configured streaming model
         """
+        from .streaming_model import StreamingOpenRouterModel
+
         return StreamingOpenRouterModel(
             model=self.agent.config.get("model", "openai/gpt-4o-mini"),
             temperature=self.agent.config.get("temperature", 0.7)
@@ -97,19 +140,18 @@ class AgentSession:
         history_file = self.manager.history_dir / f"{self.agent.name}.json"
         if history_file.exists():
             try:
-                with open(history_file) as f:
-                    data = json.load(f)
-                    result = []
-                    for item in data:
-                        role = item["role"]
-                        message = item["message"]
-                        # Support both old and new formats
-                        metadata = {
-                            "tool_calls": item.get("tool_calls", []),
-                            "usage": item.get("usage", {})
-                        }
-                        result.append((role, message, metadata))
-                    return result
+                data = _json.loads(history_file.read_bytes())
+                result = []
+                for item in data:
+                    role = item["role"]
+                    message = item["message"]
+                    # Support both old and new formats
+                    metadata = {
+                        "tool_calls": item.get("tool_calls", []),
+                        "usage": item.get("usage", {})
+                    }
+                    result.append((role, message, metadata))
+                return result
             except Exception:
                 return []
 
@@ -121,18 +163,11 @@ class AgentSession:
             return
 
         history_file = self.manager.history_dir / f"{self.agent.name}.json"
-        data = []
-        for role, msg, metadata in self.history:
-            entry = {"role": role, "message": msg}
-            # Only include metadata fields if they have content
-            if metadata.get("tool_calls"):
-                entry["tool_calls"] = metadata["tool_calls"]
-            if metadata.get("usage"):
-                entry["usage"] = metadata["usage"]
-            data.append(entry)
-
-        with open(history_file, 'w') as f:
-            json.dump(data, f, indent=2)
+        data = [_history_entry(*item) for item in self.history]
+
+        # Same compact format and atomic write as the CLI runtime, which shares
+        # these files, so an interrupted save never truncates history
+        _write_json_atomic(history_file, data)
 
     def _format_tool_calls_for_context(self, tool_calls: list[dict]) -> str:
         """Format tool calls for inclusion in LLM context.
@@ -174,9 +209,9 @@ class AgentSession:
         if self.agent.system_prompt:
             parts.append(self.agent.system_prompt)
 
-        for cap_name in self.agent.capabilities:
-            if cap_name in CAPABILITIES:
-                parts.append(CAPABILITIES[cap_name].system_prompt_addition)
+        capability_prompt = combined_prompt(tuple(self.agent.capabilities))
+        if capability_prompt:
+            parts.append(capability_prompt)
 
         return "\n\n".join(parts)
 
@@ -188,6 +223,36 @@ class AgentSession:
         """
         return [schema.to_openrouter_format() for schema in self.tool_schemas.values()]
 
+    def _to_api_message(self, role: str, message: str, metadata: dict) -> dict:
+        """Convert a history item to a chat API message.
+
+        Args:
+            role: History role ("user" or "agent")
+            message: Message text
+            metadata: Item metadata with optional tool_calls
+
+        Returns:
+            Message dict with role and content keys
+        """
+        # For agent messages with tool calls, append tool summary to content
+        content = message
+        if role == "agent" and metadata.get("tool_calls"):
+            tool_summary = self._format_tool_calls_for_context(metadata["tool_calls"])
+            content = f"{message}\n\n{tool_summary}"
+
+        return {"role": "user" if role == "user" else "assistant", "content": content}
+
+    def _add_history_item(self, role: str, message: str, metadata: dict) -> None:
+        """Add an item to the history and the API message window.
+
+        Args:
+            role: History role ("user" or "agent")
+            message: Message text
+            metadata: Item metadata (tool_calls, usage)
+        """
+        self.history.append((role, message, metadata))
+        self._window.append(self._to_api_message(role, message, metadata))
+
     def _build_messages(self, user_input: str) -> list[dict]:
         """Build messages array for LLM request.
 
@@ -200,21 +265,11 @@ class AgentSession:
         messages = []
 
         # Add system prompt
-        system_prompt = self._build_system_prompt()
-        if system_prompt:
-            messages.append({"role": "system", "content": system_prompt})
+        if self._system_message is not None:
+            messages.append(self._system_message)
 
         # Add history (last 10 exchanges = 20 messages)
-        for role, message, metadata in self.history[-20:]:
-            api_role = "user" if role == "user" else "assistant"
-
-            # For agent messages with tool calls, append tool summary to content
-            content = message
-            if role == "agent" and metadata.get("tool_calls"):
-                tool_summary = self._format_tool_calls_for_context(metadata["tool_calls"])
-                content = f"{message}\n\n{tool_summary}"
-
-            messages.append({"role": api_role, "content": content})
+        messages.extend(self._window)
 
         # Add current user input
         messages.append({"role": "user", "content": user_input})
@@ -227,11 +282,179 @@ class AgentSession:
         Args:
             message: Message dictionary to send
         """
+        await self._send_frame(_json.dumps(message))
+
+    async def _send_frame(self, frame: bytes) -> None:
+        """Send an encoded JSON message to the client.
+
+        Args:
+            frame: UTF-8 JSON bytes
+        """
+        async with self._send_lock:
+            if self._closed:
+                return
+            try:
+                # Encoded with aba._json (orjson when installed) but sent as a text
+                # frame, which the web UI parses with JSON.parse like send_json's
+                await self.websocket.send_text(frame.decode())
+            except Exception as e:
+                # WebSocket closed or error
+                self._closed = True
+                logger.warning(f"Failed to send message to WebSocket: {type(e).__name__}: {e}")
+
+    async def _queue_delta(self, delta: str) -> None:
+        """Buffer a content delta, sending the buffer once it is due.
+
+        Args:
+            delta: Streamed text to send to the client
+        """
+        self._pending_deltas.append(delta)
+        self._pending_chars += len(delta)
+        if self._pending_chars >= _DELTA_FLUSH_CHARS:
+            await self._flush_deltas()
+        elif self._flush_handle is None:
+            # Send held text even if the model pauses before the next delta
+            self._flush_handle = asyncio.get_running_loop().call_later(
+                _DELTA_FLUSH_INTERVAL, self._start_timed_flush
+            )
+
+    def _start_timed_flush(self) -> None:
+        """Flush buffered deltas from the timer set by _queue_delta."""
+        self._flush_handle = None
+        self._flush_task = asyncio.create_task(self._flush_deltas())
+
+    async def _flush_deltas(self) -> None:
+        """Send buffered content deltas as a single stream_chunk frame."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending_deltas:
+            return
+        content = "".join(self._pending_deltas)
+        self._pending_deltas.clear()
+        self._pending_chars = 0
+        await self._send_frame(_STREAM_CHUNK_PREFIX + _json.dumps(content) + _STREAM_CHUNK_SUFFIX)
+
+    async def _stop_timed_flush(self) -> None:
+        """Cancel the flush timer and wait for a timed flush already started.
+
+        Text still buffered here was left by a turn that stopped early, so it
+        is dropped rather than sent ahead of the next turn.
+        """
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._flush_task is not None:
+            # Not cancelled: the task may already hold text taken from the buffer
+            await self._flush_task
+            self._flush_task = None
+        self._pending_deltas.clear()
+        self._pending_chars = 0
+
+    def _is_parallel_safe(self, tool_call: dict) -> bool:
+        """Check whether a tool call only reads state.
+
+        Args:
+            tool_call: Tool call from the model, in OpenAI format
+
+        Returns:
+            True if the called tool is available and marked parallel-safe
+        """
+        schema = self.tool_schemas.get(tool_call["function"]["name"])
+        return schema is not None and schema.parallel_safe
+
+    async def _run_single_tool(self, tool_call: dict) -> tuple[dict, dict]:
+        """Execute one tool call, reporting its start and result to the client.
+
+        Args:
+            tool_call: Tool call from the model, in OpenAI format
+
+        Returns:
+            Tuple of (tool message for the next request, tool call record for history)
+        """
+        tool_name = tool_call["function"]["name"]
+        tool_args_str = tool_call["function"]["arguments"]
+        tool_call_id = tool_call["id"]
+        display_args = {}
+
         try:
-            await self.websocket.send_json(message)
+            # Parse arguments
+            tool_args = _json.loads(tool_args_str)
+            logger.info(f"Executing tool: {tool_name} with args: {tool_args}")
+
+            # Send tool start notification, showing only the tool's public arguments
+            schema = self.tool_schemas.get(tool_name)
+            if schema is not None:
+                display_args = {k: tool_args[k] for k in schema.public_params if k in tool_args}
+            else:
+                display_args = {k: v for k, v in tool_args.items() if not k.startswith("_")}
+            await self.send_message(asdict(ToolStart(
+                tool_name=tool_name,
+                tool_call_id=tool_call_id,
+                arguments=display_args
+            )))
+
+            # Execute tool
+            if schema is None:
+                result = f"Error: Tool '{tool_name}' not found"
+                success = False
+                logger.error(f"Tool '{tool_name}' not found in available tools")
+            else:
+                # Inject special parameters
+                if schema.needs_manager:
+                    tool_args["_manager"] = self.manager
+                if schema.needs_runtime:
+                    tool_args["_runtime"] = self
+
+                # Run synchronous tool in thread pool
+                logger.debug(f"Running tool {tool_name} in thread pool")
+                result = await asyncio.to_thread(
+                    schema.function,
+                    **tool_args
+                )
+                success = True
+                logger.info(f"Tool {tool_name} completed successfully")
+
+        except _json.JSONDecodeError as e:
+            result = f"Error: Invalid JSON arguments: {e}"
+            success = False
+            logger.error(f"JSON decode error for tool {tool_name}: {e}")
+        except TypeError as e:
+            result = f"Error: Invalid arguments: {e}"
+            success = False
+            logger.error(f"Type error executing tool {tool_name}: {e}")
         except Exception as e:
-            # WebSocket closed or error
-            logger.warning(f"Failed to send message to WebSocket: {type(e).__name__}: {e}")
+            result = f"Error executing tool: {e}"
+            success = False
+            logger.error(f"Unexpected error executing tool {tool_name}: {e}", exc_info=True)
+
+        # Convert once; the result goes to the client, history and the model
+        result_str = result if isinstance(result, str) else str(result)
+
+        # Send tool result to client
+        await self.send_message(asdict(ToolResult(
+            tool_name=tool_name,
+            tool_call_id=tool_call_id,
+            result=result_str,
+            success=success
+        )))
+
+        # Record tool call details for history
+        record = {
+            "tool_name": tool_name,
+            "arguments": display_args,  # Already filtered from _manager/_runtime
+            "result": result_str[:1000],  # Truncate long results
+            "success": not result_str.startswith("Error"),
+            "result_length": len(result_str)
+        }
+
+        # Tool result message for the next request
+        message = {
+            "role": "tool",
+            "tool_call_id": tool_call_id,
+            "content": result_str
+        }
+        return message, record
 
     async def handle_user_message(self, user_input: str) -> None:
         """Process user message with streaming response.
@@ -246,10 +469,22 @@ class AgentSession:
             user_input: User's message
         """
         logger.info(f"Handling user message (length={len(user_input)})")
+        try:
+            await self._process_turn(user_input)
+        finally:
+            # No timed flush may outlive the turn
+            await self._stop_timed_flush()
+
+    async def _process_turn(self, user_input: str) -> None:
+        """Run one chat turn for handle_user_message.
+
+        Args:
+            user_input: User's message
+        """
 
         # Build messages
         messages = self._build_messages(user_input)
-        tools = self._build_tools_array() if self.tool_schemas else None
+        tools = self._tools_array
 
         # Track accumulated content and tool calls for history
         accumulated_content = ""
@@ -260,162 +495,104 @@ class AgentSession:
         for iteration in range(max_iterations):
             logger.debug(f"Tool execution loop iteration {iteration + 1}/{max_iterations}")
             try:
-                # Stream from LLM
-                async for chunk in self.model.chat_stream(messages, tools=tools):
-                    chunk_type = chunk.get("type")
-
-                    if chunk_type == "content":
-                        # Stream text to client
-                        delta = chunk["delta"]
-                        accumulated_content += delta
-                        await self.send_message({
-                            "type": "stream_chunk",
-                            "content": delta,
-                            "is_complete": False
-                        })
-
-                    elif chunk_type == "tool_calls":
-                        # Execute tools
-                        tool_calls = chunk["calls"]
-                        logger.info(f"Received {len(tool_calls)} tool calls")
-
-                        # Add assistant message with tool calls to messages
-                        messages.append({
-                            "role": "assistant",
-                            "content": accumulated_content or None,
-                            "tool_calls": tool_calls
-                        })
-
-                        # Execute each tool
-                        for tool_call in tool_calls:
-                            tool_name = tool_call["function"]["name"]
-                            tool_args_str = tool_call["function"]["arguments"]
-                            tool_call_id = tool_call["id"]
-
-                            try:
-                                # Parse arguments
-                                tool_args = json.loads(tool_args_str)
-                                logger.info(f"Executing tool: {tool_name} with args: {tool_args}")
-
-                                # Send tool start notification
-                                display_args = {k: v for k, v in tool_args.items() if not k.startswith("_")}
-                                await self.send_message({
-                                    "type": "tool_start",
-                                    "tool_name": tool_name,
-                                    "arguments": display_args
-                                })
-
-                                # Execute tool
-                                if tool_name not in self.tool_schemas:
-                                    result = f"Error: Tool '{tool_name}' not found"
-                                    success = False
-                                    logger.error(f"Tool '{tool_name}' not found in available tools")
-                                else:
-                                    schema = self.tool_schemas[tool_name]
-
-                                    # Inject special parameters
-                                    if "_manager" in schema.function.__code__.co_varnames:
-                                        tool_args["_manager"] = self.manager
-                                    if "_runtime" in schema.function.__code__.co_varnames:
-                                        tool_args["_runtime"] = self
-
-                                    # Run synchronous tool in thread pool
-                                    logger.debug(f"Running tool {tool_name} in thread pool")
-                                    result = await asyncio.to_thread(
-                                        schema.function,
-                                        **tool_args
-                                    )
-                                    success = True
-                                    logger.info(f"Tool {tool_name} completed successfully")
-
-                            except json.JSONDecodeError as e:
-                                result = f"Error: Invalid JSON arguments: {e}"
-                                success = False
-                                logger.error(f"JSON decode error for tool {tool_name}: {e}")
-                            except TypeError as e:
-                                result = f"Error: Invalid arguments: {e}"
-                                success = False
-                                logger.error(f"Type error executing tool {tool_name}: {e}")
-                            except Exception as e:
-                                result = f"Error executing tool: {e}"
-                                success = False
-                                logger.error(f"Unexpected error executing tool {tool_name}: {e}", exc_info=True)
-
-                            # Send tool result to client
+                # Stream from LLM; aclosing() releases the HTTP connection as soon
+                # as the loop exits (including the break after tool calls) instead
+                # of whenever the abandoned generator is garbage collected
+                async with aclosing(self.model.chat_stream(messages, tools=tools)) as stream:
+                    async for chunk in stream:
+                        if self._closed:
+                            # The client is gone; stop generating and release the connection
+                            logger.info("WebSocket closed, stopping generation")
+                            return
+
+                        chunk_type = chunk.get("type")
+
+                        if chunk_type == "content":
+                            # Stream text to client
+                            delta = chunk["delta"]
+                            accumulated_content += delta
+                            await self._queue_delta(delta)
+
+                        elif chunk_type == "tool_calls":
+                            # Execute tools
+                            await self._flush_deltas()
+                            tool_calls = chunk["calls"]
+                            logger.info(f"Received {len(tool_calls)} tool calls")
+
+                            # Add assistant message with tool calls to messages
+                            messages.append({
+                                "role": "assistant",
+                                "content": accumulated_content or None,
+                                "tool_calls": tool_calls
+                            })
+
+                            # Calls may depend on earlier ones in the same message (write
+                            # a file, then run it), so they run in order unless every tool
+                            # only reads; gather keeps results in call order
+                            if len(tool_calls) > 1 and all(
+                                self._is_parallel_safe(tool_call) for tool_call in tool_calls
+                            ):
+                                results = await asyncio.gather(
+                                    *(self._run_single_tool(tool_call) for tool_call in tool_calls)
+                                )
+                            else:
+                                results = [await self._run_single_tool(tool_call) for tool_call in tool_calls]
+                            for message, record in results:
+                                messages.append(message)
+                                accumulated_tool_calls.append(record)
+
+                            # Reset accumulated content for next iteration
+                            accumulated_content = ""
+
+                            # Continue loop to get next response
+                            break  # Break inner async for loop to start next iteration
+
+                        elif chunk_type == "done":
+                            # Completion - send final messages
+                            logger.info("Stream complete, sending final message")
+                            await self._flush_deltas()
                             await self.send_message({
-                                "type": "tool_result",
-                                "tool_name": tool_name,
-                                "result": str(result),
-                                "success": success
+                                "type": "stream_chunk",
+                                "content": "",
+                                "is_complete": True
                             })
 
-                            # Record tool call details for history
-                            result_str = str(result)
-                            accumulated_tool_calls.append({
-                                "tool_name": tool_name,
-                                "arguments": display_args,  # Already filtered from _manager/_runtime
-                                "result": result_str[:1000],  # Truncate long results
-                                "success": not result_str.startswith("Error"),
-                                "result_length": len(result_str)
+                            usage = chunk.get("usage", {
+                                "prompt_tokens": 0,
+                                "completion_tokens": 0,
+                                "total_tokens": 0
                             })
+                            self.current_usage = usage
 
-                            # Add tool result to messages
-                            messages.append({
-                                "role": "tool",
-                                "tool_call_id": tool_call_id,
-                                "content": str(result)
+                            await self.send_message({
+                                "type": "agent_message",
+                                "content": accumulated_content,
+                                "usage": usage
                             })
 
-                        # Reset accumulated content for next iteration
-                        accumulated_content = ""
-
-                        # Continue loop to get next response
-                        break  # Break inner async for loop to start next iteration
-
-                    elif chunk_type == "done":
-                        # Completion - send final messages
-                        logger.info("Stream complete, sending final message")
-                        await self.send_message({
-                            "type": "stream_chunk",
-                            "content": "",
-                            "is_complete": True
-                        })
-
-                        usage = chunk.get("usage", {
-                            "prompt_tokens": 0,
-                            "completion_tokens": 0,
-                            "total_tokens": 0
-                        })
-                        self.current_usage = usage
-
-                        await self.send_message({
-                            "type": "agent_message",
-                            "content": accumulated_content,
-                            "usage": usage
-                        })
-
-                        # Save to history with metadata
-                        self.history.append(("user", user_input, {}))
-                        metadata = {
-                            "tool_calls": accumulated_tool_calls,
-                            "usage": usage
-                        }
-                        self.history.append(("agent", accumulated_content, metadata))
-                        self._save_history()
-                        logger.debug(f"History saved (total items: {len(self.history)})")
-
-                        # Exit tool execution loop
-                        return
-
-                    elif chunk_type == "error":
-                        # Error occurred
-                        logger.error(f"Error from streaming model: {chunk['message']}")
-                        await self.send_message({
-                            "type": "error",
-                            "message": chunk["message"],
-                            "recoverable": True
-                        })
-                        return
+                            # Save to history with metadata
+                            self._add_history_item("user", user_input, {})
+                            metadata = {
+                                "tool_calls": accumulated_tool_calls,
+                                "usage": usage
+                            }
+                            self._add_history_item("agent", accumulated_content, metadata)
+                            await asyncio.to_thread(self._save_history)
+                            logger.debug(f"History saved (total items: {len(self.history)})")
+
+                            # Exit tool execution loop
+                            return
+
+                        elif chunk_type == "error":
+                            # Error occurred
+                            logger.error(f"Error from streaming model: {chunk['message']}")
+                            await self._flush_deltas()
+                            await self.send_message({
+                                "type": "error",
+                                "message": chunk["message"],
+                                "recoverable": True
+                            })
+                            return
 
                 # If we get here, we finished streaming but need to continue tool loop
                 # (happens when tool_calls is the last chunk)
@@ -423,6 +600,7 @@ class AgentSession:
             except Exception as e:
                 # Unexpected error
                 logger.error(f"Unexpected error in handle_user_message: {type(e).__name__}: {e}", exc_info=True)
+                await self._flush_deltas()
                 await self.send_message({
                     "type": "error",
                     "message": f"Session error: {str(e)}",
@@ -438,7 +616,14 @@ class AgentSession:
             "recoverable": False
         })
 
-    def clear_history(self) -> None:
+    async def close(self) -> None:
+        """Stop sending to the client and save history when the socket closes."""
+        self._closed = True
+        await self._stop_timed_flush()
+        await asyncio.to_thread(self._save_history)
+
+    async def clear_history(self) -> None:
         """Clear chat history."""
         self.history.clear()
-        self._save_history()
+        self._window.clear()
+        await asyncio.to_thread(self._save_history)
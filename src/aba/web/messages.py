@@ -48,6 +48,7 @@ class ToolStart:
 
     type: Literal["tool_start"] = "tool_start"
     tool_name: str = ""
+    tool_call_id: str = ""
     arguments: dict[str, Any] | None = None
 
 
@@ -57,6 +58,7 @@ class ToolResult:
 
     type: Literal["tool_result"] = "tool_result"
     tool_name: str = ""
+    tool_call_id: str = ""
     result: str = ""
     success: bool = True
 
@@ -156,6 +156,7 @@ async def websocket_chat(websocket: WebSocket, agent_name: str):
 
         # Create session
         session = AgentSession(agent, manager, websocket)
+        await session.start()
         logger.debug(f"Session created for agent '{agent_name}' with {len(session.tool_schemas)} tools")
 
         # Message loop
@@ -176,7 +177,7 @@ async def websocket_chat(websocket: WebSocket, agent_name: str):
 
             elif message_type == "clear_history":
                 logger.info("Clearing chat history")
-                session.clear_history()
+                await session.clear_history()
                 await websocket.send_json({
                     "type": "info",
                     "message": "History cleared"
@@ -202,7 +203,7 @@ async def websocket_chat(websocket: WebSocket, agent_name: str):
         # Client disconnected - save history
         logger.info(f"Client disconnected from agent '{agent_name}' (code={e.code}, reason={e.reason})")
         try:
-            session._save_history()
+            await session.close()
             manager.set_last_agent(agent_name)
             logger.debug(f"History saved and last agent updated for '{agent_name}'")
         except Exception as save_error:
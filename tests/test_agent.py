@@ -88,3 +88,48 @@ def test_agent_round_trip_serialization():
     assert restored.description == original.description
     assert restored.capabilities == original.capabilities
     assert restored.system_prompt == original.system_prompt
+
+
+def test_agent_round_trip_preserves_every_field():
+    """Test that to_dict/from_dict round-trips all dataclass fields."""
+    from dataclasses import fields
+
+    original = Agent(
+        name="full",
+        description="All fields set",
+        version="2.1",
+        created="2024-01-01T00:00:00",
+        last_used="2024-03-01T12:00:00",
+        capabilities=["code-execution"],
+        system_prompt="Prompt",
+        config={"model": "custom", "temperature": 0.1},
+        metadata={"owner": "tests"},
+    )
+
+    data = original.to_dict()
+    restored = Agent.from_dict(data)
+
+    assert list(data) == [f.name for f in fields(Agent)]
+    assert restored == original
+
+
+def test_agent_default_timestamps_and_config():
+    """Test that defaults are filled per agent and never shared."""
+    agent1 = Agent(name="one", description="First")
+    agent2 = Agent(name="two", description="Second")
+
+    assert agent1.created
+    assert agent1.created == agent1.last_used
+
+    agent1.config["model"] = "custom-model"
+    assert agent2.config["model"] == "openai/gpt-4o-mini"
+
+    restored = Agent.from_dict({
+        "name": "old",
+        "description": "Saved earlier",
+        "created": "2024-01-01T00:00:00",
+        "last_used": "2024-02-01T00:00:00",
+    })
+    assert restored.created == "2024-01-01T00:00:00"
+    assert restored.last_used == "2024-02-01T00:00:00"
+    assert restored.config["preserve_history"] is True
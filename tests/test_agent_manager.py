@@ -1,9 +1,10 @@
 """Tests for the AgentManager."""
 
+import json
 from pathlib import Path
 
 from aba.agent import Agent
-from aba.agent_manager import AgentManager
+from aba.agent_manager import AgentManager, _history_entry
 
 
 def test_agent_manager_initialization(tmp_path):
@@ -39,6 +40,38 @@ def test_save_and_load_agent(tmp_path):
     assert loaded.capabilities == ["file-operations"]
 
 
+def test_load_agent_cache(tmp_path):
+    """Test that cached agents are isolated copies and refreshed on change."""
+    import os
+
+    manager = AgentManager(base_path=tmp_path)
+    manager.save_agent(Agent(name="cached", description="Original"))
+
+    first = manager.load_agent("cached")
+    first.config["model"] = "mutated"
+    first.capabilities.append("web-access")
+
+    second = manager.load_agent("cached")
+    assert second.config["model"] == "openai/gpt-4o-mini"
+    assert second.capabilities == []
+
+    # Another process rewrites the file
+    agent_file = manager.agents_dir / "cached.json"
+    agent_file.write_text(agent_file.read_text().replace("Original", "Changed"))
+    stat = agent_file.stat()
+    os.utime(agent_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert manager.load_agent("cached").description == "Changed"
+
+
+def test_save_agent_leaves_no_temp_file(tmp_path):
+    """Test that atomic saves clean up their temp file."""
+    manager = AgentManager(base_path=tmp_path)
+    manager.save_agent(Agent(name="atomic", description="Test"))
+
+    assert sorted(p.name for p in manager.agents_dir.iterdir()) == ["atomic.json"]
+
+
 def test_load_nonexistent_agent(tmp_path):
     """Test that loading a nonexistent agent raises FileNotFoundError."""
     manager = AgentManager(base_path=tmp_path)
@@ -71,6 +104,87 @@ def test_list_agents(tmp_path):
     assert agents == ["agent-one", "agent-two", "zebra"]
 
 
+def test_agent_summaries_use_index(tmp_path, monkeypatch):
+    """Test that listings read the index and only reload changed agents."""
+    import os
+
+    manager = AgentManager(base_path=tmp_path)
+    manager.save_agent(Agent(name="alpha", description="First", capabilities=["web-access"]))
+    manager.save_agent(Agent(name="beta", description="Second"))
+    (manager.agents_dir / "broken.json").write_text("{not json")
+
+    assert manager.agent_summaries() == {
+        "alpha": ("First", ["web-access"]),
+        "beta": ("Second", []),
+        "broken": None,
+    }
+    assert manager.index_file.exists()
+
+    # A fresh manager answers from the index without opening agent files
+    fresh = AgentManager(base_path=tmp_path)
+    loads = []
+    real_load = AgentManager.load_agent
+
+    def recording_load(self, name):
+        loads.append(name)
+        return real_load(self, name)
+
+    monkeypatch.setattr(AgentManager, "load_agent", recording_load)
+    assert fresh.agent_summaries()["alpha"] == ("First", ["web-access"])
+    assert loads == ["broken"]
+
+    # Changed and deleted agents are picked up
+    agent = fresh.load_agent("beta")
+    agent.description = "Updated"
+    fresh.save_agent(agent)
+    fresh.delete_agent("alpha")
+    assert fresh.agent_summaries() == {"beta": ("Updated", []), "broken": None}
+
+    # Edits made outside the manager are caught by the mtime check
+    agent_file = fresh.agents_dir / "beta.json"
+    agent_file.write_text(agent_file.read_text().replace("Updated", "Edited"))
+    stat = agent_file.stat()
+    os.utime(agent_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    assert AgentManager(base_path=tmp_path).agent_summaries()["beta"] == ("Edited", [])
+
+
+def test_agent_summaries_rebuild_an_index_that_is_not_an_object(tmp_path):
+    """Test that a valid JSON index of the wrong type is replaced."""
+    manager = AgentManager(base_path=tmp_path)
+    manager.save_agent(Agent(name="alpha", description="First"))
+
+    for content in ("[]", "null", "{not json"):
+        manager.index_file.write_text(content)
+        fresh = AgentManager(base_path=tmp_path)
+        assert fresh.agent_summaries() == {"alpha": ("First", [])}
+        assert json.loads(manager.index_file.read_text())["alpha"]["description"] == "First"
+
+    # An empty directory still replaces the bad index
+    manager.delete_agent("alpha")
+    manager.index_file.write_text("[]")
+    assert AgentManager(base_path=tmp_path).agent_summaries() == {}
+    assert json.loads(manager.index_file.read_text()) == {}
+
+
+def test_concurrent_saves_share_one_manager(tmp_path):
+    """Test that saves from several threads neither collide nor lose index entries."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    manager = AgentManager(base_path=tmp_path)
+    names = [f"agent-{i}" for i in range(16)]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda name: manager.save_agent(Agent(name=name, description=name)), names))
+
+    # Saves only update the in-memory index; the listing writes it once
+    assert not manager.index_file.exists()
+    assert list(manager.agent_summaries()) == sorted(names)
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "agent_index.json", "agents", "history"
+    ]
+    assert sorted(AgentManager(base_path=tmp_path).agent_summaries()) == sorted(names)
+
+
 def test_agent_exists(tmp_path):
     """Test checking if an agent exists."""
     manager = AgentManager(base_path=tmp_path)
@@ -122,6 +236,52 @@ def test_get_and_set_last_agent(tmp_path):
     assert manager.config_file.exists()
 
 
+def test_set_last_agent_preserves_config_and_skips_unchanged(tmp_path):
+    """Test that set_last_agent keeps other keys and skips no-op writes."""
+    manager = AgentManager(base_path=tmp_path)
+    manager.config_file.write_text('{"theme": "dark"}')
+
+    manager.set_last_agent("my-agent")
+
+    assert '"theme"' in manager.config_file.read_text()
+    assert AgentManager(base_path=tmp_path).get_last_agent() == "my-agent"
+
+    # Setting the same agent again should not touch the file
+    mtime_ns = manager.config_file.stat().st_mtime_ns
+    manager.set_last_agent("my-agent")
+    assert manager.config_file.stat().st_mtime_ns == mtime_ns
+
+    # A file removed behind the manager's back is rewritten
+    manager.config_file.unlink()
+    manager.set_last_agent("my-agent")
+    assert AgentManager(base_path=tmp_path).get_last_agent() == "my-agent"
+
+
+def test_last_agent_follows_other_managers(tmp_path):
+    """Test that a manager sees last_agent changes made by another one."""
+    import os
+
+    first = AgentManager(base_path=tmp_path)
+    second = AgentManager(base_path=tmp_path)
+
+    def set_elsewhere(manager, name):
+        manager.set_last_agent(name)
+        # Rewrites can land within the clock's granularity; make each one visible
+        stat = manager.config_file.stat()
+        os.utime(manager.config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    set_elsewhere(first, "alpha")
+    assert second.get_last_agent() == "alpha"
+
+    # first still holds "alpha", which must not make it skip this write
+    set_elsewhere(second, "beta")
+    set_elsewhere(first, "alpha")
+    assert second.get_last_agent() == "alpha"
+
+    set_elsewhere(second, "gamma")
+    assert first.get_last_agent() == "gamma"
+
+
 def test_bootstrap_creates_agent_builder(tmp_path):
     """Test that bootstrap creates the agent-builder agent."""
     manager = AgentManager(base_path=tmp_path)
@@ -153,3 +313,11 @@ def test_bootstrap_is_idempotent(tmp_path):
     # Should overwrite and return same definition
     assert agent1.name == agent2.name
     assert agent1.capabilities == agent2.capabilities
+
+
+def test_history_entry_keeps_only_filled_metadata():
+    """Test the shared history file format used by the CLI and web sessions."""
+    assert _history_entry("user", "Hi", {}) == {"role": "user", "message": "Hi"}
+    assert _history_entry("agent", "Done", {"tool_calls": [], "usage": {"total_tokens": 5}}) == {
+        "role": "agent", "message": "Done", "usage": {"total_tokens": 5}
+    }
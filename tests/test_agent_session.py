@@ -0,0 +1,281 @@
+"""Tests for the web AgentSession."""
+
+import asyncio
+import json
+import threading
+
+from aba.agent import Agent
+from aba.agent_manager import AgentManager
+from aba.tool_schema import tool
+from aba.web import agent_session
+from aba.web.agent_session import AgentSession
+
+
+class _FakeWebSocket:
+    """Records the JSON frames a session sends."""
+
+    def __init__(self, fail: bool = False, delay: float = 0):
+        self.frames = []
+        self.attempts = 0
+        self.fail = fail
+        self.delay = delay
+
+    async def send_text(self, text):
+        self.attempts += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("socket closed")
+        self.frames.append(json.loads(text))
+
+
+class _FakeModel:
+    """Plays back one scripted event generator per chat_stream call."""
+
+    def __init__(self, *turns):
+        self.turns = list(turns)
+        self.requests = []
+
+    def chat_stream(self, messages, tools=None):
+        self.requests.append(list(messages))
+        return self.turns.pop(0)()
+
+
+def _reply(*deltas, usage=None):
+    """Build a model turn that streams deltas and finishes."""
+    async def events():
+        for delta in deltas:
+            yield {"type": "content", "delta": delta}
+        yield {"type": "done", "usage": usage or {"total_tokens": 3}}
+    return events
+
+
+def _tool_turn(*calls):
+    """Build a model turn that asks for (id, name, arguments) tool calls."""
+    async def events():
+        yield {"type": "tool_calls", "calls": [
+            {"id": call_id, "type": "function",
+             "function": {"name": name, "arguments": json.dumps(arguments)}}
+            for call_id, name, arguments in calls
+        ]}
+    return events
+
+
+def _session(tmp_path, model, websocket=None, **agent_fields):
+    """Create and start a session for a test agent with a fake model."""
+    manager = AgentManager(base_path=tmp_path)
+    agent = Agent(name="web-agent", description="Test agent", **agent_fields)
+    session = AgentSession.__new__(AgentSession)
+    # Swap in the fake model before __init__ would build a real one
+    session._create_model = lambda: model
+    AgentSession.__init__(session, agent, manager, websocket or _FakeWebSocket())
+    asyncio.run(session.start())
+    return session
+
+
+def _frames(session, frame_type):
+    return [frame for frame in session.websocket.frames if frame["type"] == frame_type]
+
+
+def test_session_saves_history_and_reloads_it(tmp_path):
+    """Test that a finished turn is saved compactly and loaded by the next session."""
+    session = _session(tmp_path, _FakeModel(_reply("Hello")))
+    asyncio.run(session.handle_user_message("Hi"))
+
+    history_file = session.manager.history_dir / "web-agent.json"
+    assert json.loads(history_file.read_text()) == [
+        {"role": "user", "message": "Hi"},
+        {"role": "agent", "message": "Hello", "usage": {"total_tokens": 3}},
+    ]
+    assert b"\n" not in history_file.read_bytes()
+    assert [p.name for p in history_file.parent.iterdir()] == ["web-agent.json"]
+
+    model = _FakeModel(_reply("Again"))
+    reloaded = _session(tmp_path, model)
+    assert [item[:2] for item in reloaded.history] == [("user", "Hi"), ("agent", "Hello")]
+    asyncio.run(reloaded.handle_user_message("Once more"))
+    assert model.requests[0][-3:] == [
+        {"role": "user", "content": "Hi"},
+        {"role": "assistant", "content": "Hello"},
+        {"role": "user", "content": "Once more"},
+    ]
+
+
+def test_session_loads_empty_and_indented_history_files(tmp_path):
+    """Test loading an empty array and an older pretty-printed history file."""
+    history_dir = tmp_path / "history"
+    history_dir.mkdir()
+    history_file = history_dir / "web-agent.json"
+
+    history_file.write_text("[]")
+    session = _session(tmp_path, _FakeModel(_reply("Fine")))
+    assert session.history == []
+    asyncio.run(session.handle_user_message("Hi"))
+    assert len(json.loads(history_file.read_text())) == 2
+
+    history_file.write_text(json.dumps([
+        {"role": "user", "message": "Read it"},
+        {"role": "agent", "message": "Done", "tool_calls": [{
+            "tool_name": "read_file", "arguments": {"path": "a.txt"},
+            "result": "contents", "success": True, "result_length": 8,
+        }]},
+    ], indent=2))
+    session = _session(tmp_path, _FakeModel())
+    assert session.history[1][2]["tool_calls"][0]["tool_name"] == "read_file"
+    assert list(session._window)[1]["content"].startswith("Done\n\n[Tools used:")
+
+
+def test_session_coalesces_deltas_and_flushes_at_the_end(tmp_path):
+    """Test that deltas share frames and everything is sent before completion."""
+    deltas = ["word "] * 120
+    session = _session(tmp_path, _FakeModel(_reply(*deltas)))
+    asyncio.run(session.handle_user_message("Talk"))
+
+    chunks = _frames(session, "stream_chunk")
+    assert 1 < len(chunks) < len(deltas)
+    assert "".join(chunk["content"] for chunk in chunks) == "".join(deltas)
+    assert chunks[-1] == {"type": "stream_chunk", "content": "", "is_complete": True}
+    assert [frame["type"] for frame in session.websocket.frames[-2:]] == [
+        "stream_chunk", "agent_message"
+    ]
+
+
+def test_session_sends_held_text_during_a_pause(tmp_path):
+    """Test that buffered text goes out on the timer while the model is idle."""
+    sent_during_pause = []
+
+    async def events():
+        yield {"type": "content", "delta": "Hel"}
+        await asyncio.sleep(agent_session._DELTA_FLUSH_INTERVAL * 5)
+        sent_during_pause.extend(frame["content"] for frame in _frames(session, "stream_chunk"))
+        yield {"type": "content", "delta": "lo"}
+        yield {"type": "done", "usage": {}}
+
+    session = _session(tmp_path, _FakeModel(events))
+    asyncio.run(session.handle_user_message("Hi"))
+
+    assert sent_during_pause == ["Hel"]
+    assert [frame["content"] for frame in _frames(session, "stream_chunk")] == ["Hel", "lo", ""]
+
+
+def test_session_turn_waits_for_a_timed_flush_in_progress(tmp_path):
+    """Test that no timed flush outlives a turn that stops early."""
+    interval = agent_session._DELTA_FLUSH_INTERVAL
+    websocket = _FakeWebSocket(delay=interval * 5)
+
+    async def events():
+        yield {"type": "content", "delta": "Hel"}
+        # Let the timer start a flush that is still sending when the turn ends
+        await asyncio.sleep(interval * 2)
+        session._closed = True
+        yield {"type": "content", "delta": "lo"}
+
+    async def turn_then_idle():
+        await session.handle_user_message("Hi")
+        finished = (session._flush_handle, session._flush_task, list(session.websocket.frames))
+        await asyncio.sleep(interval * 10)
+        return finished
+
+    session = _session(tmp_path, _FakeModel(events), websocket=websocket)
+    handle, task, frames = asyncio.run(turn_then_idle())
+
+    assert handle is None and task is None
+    assert [frame["content"] for frame in frames] == ["Hel"]
+    assert websocket.attempts == 1
+    assert session._pending_deltas == []
+
+
+def test_session_close_cancels_a_pending_flush_and_saves(tmp_path):
+    """Test that closing the session drops the flush timer and saves history."""
+    session = _session(tmp_path, _FakeModel())
+    session.history.append(("user", "Hi", {}))
+
+    async def queue_then_close():
+        await session._queue_delta("held")
+        await session.close()
+        await asyncio.sleep(agent_session._DELTA_FLUSH_INTERVAL * 5)
+
+    asyncio.run(queue_then_close())
+
+    assert session.websocket.attempts == 0
+    assert json.loads((session.manager.history_dir / "web-agent.json").read_text()) == [
+        {"role": "user", "message": "Hi"}
+    ]
+
+
+def test_session_runs_state_changing_tools_in_call_order(tmp_path, monkeypatch):
+    """Test that a write then read of one file run in order with ids on every frame."""
+    monkeypatch.chdir(tmp_path)
+    model = _FakeModel(
+        _tool_turn(
+            ("w", "write_file", {"path": "n.txt", "content": "fresh"}),
+            ("r", "read_file", {"path": "n.txt"}),
+        ),
+        _reply("Done"),
+    )
+    session = _session(tmp_path, model, capabilities=["file-operations"])
+    asyncio.run(session.handle_user_message("Write then read"))
+
+    assert [(f["type"], f["tool_call_id"]) for f in session.websocket.frames if "tool_call_id" in f] == [
+        ("tool_start", "w"), ("tool_result", "w"), ("tool_start", "r"), ("tool_result", "r"),
+    ]
+    tool_messages = [m for m in model.requests[1] if m["role"] == "tool"]
+    assert [(m["tool_call_id"], m["content"]) for m in tool_messages][1] == ("r", "fresh")
+    assert [c["tool_name"] for c in session.history[-1][2]["tool_calls"]] == [
+        "write_file", "read_file"
+    ]
+
+
+def test_session_gathers_parallel_safe_tools_keeping_call_order(tmp_path):
+    """Test that read-only calls run at once and results keep the call order."""
+    barrier = threading.Barrier(2, timeout=5)
+
+    @tool(parallel_safe=True)
+    def wait_for_peer(label: str) -> str:
+        """Block until the other call is running too.
+
+        Args:
+            label: Value to echo back
+        """
+        barrier.wait()
+        return label
+
+    model = _FakeModel(
+        _tool_turn(("a", "wait_for_peer", {"label": "first"}),
+                   ("b", "wait_for_peer", {"label": "second"})),
+        _reply("Both done"),
+    )
+    session = _session(tmp_path, model)
+    session.tool_schemas["wait_for_peer"] = wait_for_peer
+    asyncio.run(session.handle_user_message("Run both"))
+
+    tool_messages = [m for m in model.requests[1] if m["role"] == "tool"]
+    assert [(m["tool_call_id"], m["content"]) for m in tool_messages] == [
+        ("a", "first"), ("b", "second")
+    ]
+    results = {f["tool_call_id"]: f for f in _frames(session, "tool_result")}
+    assert results["a"] == {
+        "type": "tool_result", "tool_name": "wait_for_peer",
+        "tool_call_id": "a", "result": "first", "success": True,
+    }
+    assert results["b"]["result"] == "second"
+    assert _frames(session, "tool_start")[0]["arguments"] == {"label": "first"}
+
+
+def test_session_stops_streaming_once_the_socket_is_closed(tmp_path):
+    """Test that a failed send ends generation and closes the model stream."""
+    closed = []
+
+    async def endless():
+        try:
+            while True:
+                yield {"type": "content", "delta": "x" * agent_session._DELTA_FLUSH_CHARS}
+        finally:
+            closed.append(True)
+
+    session = _session(tmp_path, _FakeModel(endless), websocket=_FakeWebSocket(fail=True))
+    asyncio.run(session.handle_user_message("Hi"))
+
+    assert session.websocket.attempts == 1
+    assert closed == [True]
+    assert session.history == []
+    assert not (session.manager.history_dir / "web-agent.json").exists()
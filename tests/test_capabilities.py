@@ -0,0 +1,33 @@
+"""Tests for capability definitions."""
+
+import pytest
+
+from aba.capabilities import CAPABILITIES, combined_prompt
+
+
+def test_capabilities_registry_is_read_only():
+    """Test that the capability registry cannot be mutated."""
+    with pytest.raises(TypeError):
+        CAPABILITIES["new-capability"] = CAPABILITIES["web-access"]
+
+
+def test_capability_is_frozen_and_hashable():
+    """Test that capability definitions are immutable."""
+    capability = CAPABILITIES["file-operations"]
+
+    with pytest.raises(AttributeError):
+        capability.tools = ("exec_shell",)
+
+    assert hash(capability) == hash(CAPABILITIES["file-operations"])
+
+
+def test_combined_prompt_keeps_order_and_skips_unknown():
+    """Test combining capability prompt additions."""
+    prompt = combined_prompt(("web-access", "unknown", "file-operations"))
+
+    assert prompt == (
+        CAPABILITIES["web-access"].system_prompt_addition
+        + "\n\n"
+        + CAPABILITIES["file-operations"].system_prompt_addition
+    )
+    assert combined_prompt(()) == ""
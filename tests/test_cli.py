@@ -4,7 +4,7 @@ from pathlib import Path
 from unittest.mock import MagicMock, patch
 import json
 
-from aba.cli import _list_agents, _import_agent, _export_agent, app
+from aba.cli import _build_parser, _list_agents, _import_agent, _export_agent, _parse_args_fast, app
 from aba.agent_manager import AgentManager
 from aba.agent import Agent
 
@@ -42,6 +42,18 @@ def test_list_agents_with_agents(tmp_path, capsys):
     assert "*" in captured.out  # Indicates last used agent
 
 
+def test_list_agents_includes_unreadable_agents(tmp_path, capsys):
+    """Test that agents whose files cannot be parsed are still listed by name."""
+    manager = AgentManager(base_path=tmp_path)
+    manager.save_agent(Agent(name="good", description="Works"))
+    (manager.agents_dir / "broken.json").write_text("{not json")
+
+    _list_agents(manager)
+
+    lines = capsys.readouterr().out.splitlines()
+    assert lines == ["Available agents:", "  broken", "  good - Works [chat only]"]
+
+
 def test_import_agent(tmp_path, capsys):
     """Test importing an agent from JSON."""
     manager = AgentManager(base_path=tmp_path)
@@ -97,12 +109,27 @@ def test_export_agent(tmp_path, capsys):
     assert data["capabilities"] == ["file-operations"]
 
 
+def test_export_then_import_round_trip(tmp_path, capsys):
+    """Test that an exported agent imports back unchanged, including non-ASCII text."""
+    source = AgentManager(base_path=tmp_path / "source")
+    agent = Agent(name="round-trip", description="Résumé helper ✓", capabilities=["web-access"])
+    source.save_agent(agent)
+
+    output_file = tmp_path / "round-trip.json"
+    _export_agent(source, "round-trip", str(output_file))
+
+    target = AgentManager(base_path=tmp_path / "target")
+    _import_agent(target, str(output_file))
+
+    assert target.load_agent("round-trip").to_dict() == agent.to_dict()
+
+
 def test_cli_list_command(tmp_path, capsys):
     """Test CLI --list command."""
     manager = AgentManager(base_path=tmp_path)
     manager.bootstrap()
 
-    with patch('aba.cli.AgentManager') as mock_manager_class:
+    with patch('aba.agent_manager.AgentManager') as mock_manager_class:
         mock_manager_class.return_value = manager
         app(["--list"])
 
@@ -118,10 +145,10 @@ def test_cli_bootstrap_on_first_run(tmp_path, monkeypatch, capsys):
     inputs = iter(["/exit"])
     monkeypatch.setattr('builtins.input', lambda _: next(inputs))
 
-    with patch('aba.cli.AgentManager') as mock_manager_class:
+    with patch('aba.agent_manager.AgentManager') as mock_manager_class:
         mock_manager_class.return_value = manager
 
-        with patch('aba.cli.AgentRuntime') as mock_runtime_class:
+        with patch('aba.runtime.AgentRuntime') as mock_runtime_class:
             mock_runtime = MagicMock()
             mock_runtime_class.return_value = mock_runtime
 
@@ -143,10 +170,10 @@ def test_cli_run_specific_agent(tmp_path, monkeypatch):
     inputs = iter(["/exit"])
     monkeypatch.setattr('builtins.input', lambda _: next(inputs))
 
-    with patch('aba.cli.AgentManager') as mock_manager_class:
+    with patch('aba.agent_manager.AgentManager') as mock_manager_class:
         mock_manager_class.return_value = manager
 
-        with patch('aba.cli.AgentRuntime') as mock_runtime_class:
+        with patch('aba.runtime.AgentRuntime') as mock_runtime_class:
             mock_runtime = MagicMock()
             mock_runtime_class.return_value = mock_runtime
 
@@ -167,10 +194,10 @@ def test_cli_model_override(tmp_path, monkeypatch):
     inputs = iter(["/exit"])
     monkeypatch.setattr('builtins.input', lambda _: next(inputs))
 
-    with patch('aba.cli.AgentManager') as mock_manager_class:
+    with patch('aba.agent_manager.AgentManager') as mock_manager_class:
         mock_manager_class.return_value = manager
 
-        with patch('aba.cli.AgentRuntime') as mock_runtime_class:
+        with patch('aba.runtime.AgentRuntime') as mock_runtime_class:
             mock_runtime = MagicMock()
             mock_runtime_class.return_value = mock_runtime
 
@@ -190,10 +217,10 @@ def test_cli_no_history_flag(tmp_path, monkeypatch):
     inputs = iter(["/exit"])
     monkeypatch.setattr('builtins.input', lambda _: next(inputs))
 
-    with patch('aba.cli.AgentManager') as mock_manager_class:
+    with patch('aba.agent_manager.AgentManager') as mock_manager_class:
         mock_manager_class.return_value = manager
 
-        with patch('aba.cli.AgentRuntime') as mock_runtime_class:
+        with patch('aba.runtime.AgentRuntime') as mock_runtime_class:
             mock_runtime = MagicMock()
             mock_runtime_class.return_value = mock_runtime
 
@@ -202,3 +229,58 @@ def test_cli_no_history_flag(tmp_path, monkeypatch):
             # Verify history was disabled
             called_agent = mock_runtime_class.call_args[0][0]
             assert called_agent.config["preserve_history"] is False
+
+
+def test_cli_import_does_not_load_runtime():
+    """Test that importing the CLI defers the runtime and tool modules."""
+    import os
+    import subprocess
+    import sys
+
+    import aba
+
+    src_dir = str(Path(aba.__file__).parent.parent)
+    code = "import sys, aba.cli; print(sorted({'aba.runtime', 'aba.tools'} & set(sys.modules)))"
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": src_dir},
+        check=True,
+    )
+
+    assert result.stdout.strip() == "[]"
+
+
+def test_fast_parser_matches_argparse():
+    """Test that the fast argv parser agrees with argparse on common invocations."""
+    cases = [
+        [],
+        ["my-agent"],
+        ["--list"],
+        ["--import", "agent.json"],
+        ["--export", "my-agent"],
+        ["--delete", "my-agent"],
+        ["my-agent", "--model", "gpt-4", "--no-history"],
+        ["--model", "gpt-4", "my-agent"],
+        ["--version"],
+    ]
+    parser = _build_parser()
+
+    for argv in cases:
+        assert vars(_parse_args_fast(argv)) == vars(parser.parse_args(argv)), argv
+
+
+def test_fast_parser_defers_unusual_input_to_argparse():
+    """Test that help, abbreviations and malformed input fall back to argparse."""
+    for argv in (["--help"], ["-h"], ["--lis"], ["--model=gpt-4"], ["--model"], ["a", "b"]):
+        assert _parse_args_fast(argv) is None, argv
+
+
+def test_cli_version_skips_agent_manager(capsys):
+    """Test that --version prints the version without creating a manager."""
+    with patch('aba.agent_manager.AgentManager') as mock_manager_class:
+        app(["--version"])
+
+    assert capsys.readouterr().out.startswith("aba ")
+    mock_manager_class.assert_not_called()
@@ -159,10 +159,10 @@ def test_cli_end_to_end_bootstrap(tmp_path, monkeypatch, capsys):
     inputs = iter(["/exit"])
     monkeypatch.setattr('builtins.input', lambda _: next(inputs))
 
-    with patch('aba.cli.AgentManager') as mock_manager_class:
+    with patch('aba.agent_manager.AgentManager') as mock_manager_class:
         mock_manager_class.return_value = manager
 
-        with patch('aba.cli.AgentRuntime') as mock_runtime_class:
+        with patch('aba.runtime.AgentRuntime') as mock_runtime_class:
             mock_runtime = MagicMock()
             mock_runtime_class.return_value = mock_runtime
 
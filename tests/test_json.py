@@ -0,0 +1,31 @@
+"""Tests for the JSON helpers."""
+
+import json
+
+import pytest
+
+from aba import _json
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_dumps_and_loads_round_trip(monkeypatch, use_orjson):
+    """Test that both backends round-trip the same data."""
+    if not use_orjson:
+        monkeypatch.setattr(_json, "orjson", None)
+    elif _json.orjson is None:
+        pytest.skip("orjson not installed")
+
+    data = {"name": "café-bot", "capabilities": ["file-operations"], "config": {"temperature": 0.7}}
+
+    encoded = _json.dumps(data, indent=True)
+
+    assert isinstance(encoded, bytes)
+    assert json.loads(encoded) == data
+    assert _json.loads(encoded) == data
+    assert _json.loads(encoded.decode()) == data
+
+
+def test_loads_invalid_raises_json_decode_error():
+    """Test that invalid input raises the shared JSONDecodeError type."""
+    with pytest.raises(_json.JSONDecodeError):
+        _json.loads(b"{not json")
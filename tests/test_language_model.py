@@ -0,0 +1,144 @@
+"""Tests for the language model implementations."""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from aba import _json, _openrouter, language_model
+from aba.language_model import OpenRouterLanguageModel, RuleBasedLanguageModel
+
+
+def test_rule_based_matches_keywords_case_insensitively():
+    """Test that keyword matching ignores case and also matches inside words."""
+    model = RuleBasedLanguageModel()
+
+    response = model.complete("Which TOOLS and Memory should the planner use?")
+
+    assert response.startswith("Recommended tools")
+    assert "JSON file memory" in response
+    assert "Key steps" in response
+
+
+def test_rule_based_default_response():
+    """Test the fallback response when no keyword is present."""
+    response = RuleBasedLanguageModel().complete("Hello there")
+
+    assert response == "Focus on modular design, explicit interfaces, and testable components."
+
+
+def test_rule_based_reuses_cached_responses():
+    """Test that repeated prompts are served from the response cache."""
+    language_model._rule_based_complete.cache_clear()
+    model = RuleBasedLanguageModel()
+
+    first = model.complete("What tools do I need?")
+    second = RuleBasedLanguageModel(temperature=0.5).complete("What tools do I need?")
+
+    assert first == second
+    assert language_model._rule_based_complete.cache_info().hits == 1
+
+
+def test_openrouter_model_resolves_lazily():
+    """Test that OpenRouterLanguageModel is re-exported from aba._openrouter."""
+    assert language_model.OpenRouterLanguageModel is _openrouter.OpenRouterLanguageModel
+
+    with pytest.raises(AttributeError):
+        language_model.NotAModel
+
+
+def _mock_session(monkeypatch, payload: dict) -> MagicMock:
+    """Install a fake shared HTTP client returning the given payload."""
+    session = MagicMock()
+    session.post.return_value.content = _json.dumps(payload)
+    monkeypatch.setattr(_openrouter, "_CLIENT", session)
+    monkeypatch.setattr(_openrouter, "_CLIENT_IS_HTTPX", True)
+    return session
+
+
+def test_openrouter_chat_reuses_shared_client(monkeypatch):
+    """Test that chat requests go through the shared HTTP client."""
+    monkeypatch.setenv("OPENROUTER_API_KEY", "test-key")
+    session = _mock_session(monkeypatch, {
+        "choices": [{"message": {"role": "assistant", "content": "Hi"}}],
+        "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+    })
+
+    model = OpenRouterLanguageModel()
+    model.chat([{"role": "user", "content": "Hello"}])
+    message, usage = model.chat([{"role": "user", "content": "Again"}])
+
+    assert message["content"] == "Hi"
+    assert usage["total_tokens"] == 2
+    assert session.post.call_count == 2
+    assert session.post.call_args.kwargs["headers"] == {"Authorization": "Bearer test-key"}
+    assert _json.loads(session.post.call_args.kwargs["content"])["messages"] == [
+        {"role": "user", "content": "Again"}
+    ]
+
+
+def test_openrouter_chat_reuses_tools_encoding(monkeypatch):
+    """Test that the same tools list is encoded once and spliced into each request."""
+    monkeypatch.setenv("OPENROUTER_API_KEY", "test-key")
+    session = _mock_session(monkeypatch, {"choices": [{"message": {"content": "Hi"}}]})
+    tools = [{"type": "function", "function": {"name": "read_file", "parameters": {}}}]
+    encode = MagicMock(wraps=_json.dumps)
+    monkeypatch.setattr(_openrouter._json, "dumps", encode)
+
+    model = OpenRouterLanguageModel()
+    model.chat([{"role": "user", "content": "Hello"}], tools=tools)
+    model.chat([{"role": "user", "content": "Again"}], tools=tools)
+
+    # Two request bodies plus a single encoding of the tools
+    assert encode.call_count == 3
+    body = _json.loads(session.post.call_args.kwargs["content"])
+    assert body["tools"] == tools
+    assert body["tool_choice"] == "auto"
+    assert body["messages"] == [{"role": "user", "content": "Again"}]
+
+    # A different list is encoded afresh
+    model.chat([{"role": "user", "content": "Hi"}], tools=list(tools))
+    assert encode.call_count == 5
+
+
+def test_openrouter_requires_api_key(monkeypatch):
+    """Test that a missing API key raises a helpful error."""
+    monkeypatch.delenv("OPENROUTER_API_KEY", raising=False)
+    _mock_session(monkeypatch, {})
+
+    with pytest.raises(RuntimeError, match="OPENROUTER_API_KEY"):
+        OpenRouterLanguageModel().complete("Hello")
+
+
+def test_openrouter_chat_stream_assembles_events(monkeypatch):
+    """Test that SSE chunks become content, tool call and usage events."""
+    monkeypatch.setenv("OPENROUTER_API_KEY", "test-key")
+    client = _mock_session(monkeypatch, {})
+    chunks = [
+        {"choices": [{"delta": {"content": "Let me "}}]},
+        {"choices": [{"delta": {"content": "check."}}]},
+        {"choices": [{"delta": {"tool_calls": [
+            {"index": 0, "id": "call_1", "function": {"name": "read_file", "arguments": '{"pa'}}
+        ]}}]},
+        {"choices": [{"delta": {"tool_calls": [
+            {"index": 0, "function": {"arguments": 'th": "a.txt"}'}}
+        ]}, "finish_reason": "tool_calls"}]},
+        {"choices": [], "usage": {"prompt_tokens": 3, "completion_tokens": 4, "total_tokens": 7}},
+    ]
+    lines = [": keep-alive", ""]
+    lines += [f"data: {_json.dumps(chunk).decode()}" for chunk in chunks]
+    lines.append("data: [DONE]")
+    client.stream.return_value.__enter__.return_value.iter_lines.return_value = lines
+
+    events = list(OpenRouterLanguageModel().chat_stream([{"role": "user", "content": "Hi"}]))
+
+    assert events == [
+        {"type": "content", "delta": "Let me "},
+        {"type": "content", "delta": "check."},
+        {"type": "tool_calls", "calls": [{
+            "id": "call_1",
+            "type": "function",
+            "function": {"name": "read_file", "arguments": '{"path": "a.txt"}'},
+        }]},
+        {"type": "done", "usage": {"prompt_tokens": 3, "completion_tokens": 4, "total_tokens": 7}},
+    ]
+    assert _json.loads(client.stream.call_args.kwargs["content"])["stream"] is True
@@ -2,11 +2,21 @@
 
 from unittest.mock import MagicMock, patch
 
+from aba import _json
 from aba.agent import Agent
 from aba.agent_manager import AgentManager
 from aba.runtime import AgentRuntime
 
 
+def _stream(response, usage):
+    """Build the chat_stream events for one model response."""
+    if response.get("content"):
+        yield {"type": "content", "delta": response["content"]}
+    if response.get("tool_calls"):
+        yield {"type": "tool_calls", "calls": response["tool_calls"]}
+    yield {"type": "done", "usage": usage}
+
+
 def test_runtime_initialization(tmp_path):
     """Test that AgentRuntime initializes correctly."""
     manager = AgentManager(base_path=tmp_path)
@@ -125,6 +135,9 @@ def test_runtime_saves_history(tmp_path):
     assert "tool_calls" not in data[0]
     assert "usage" not in data[0]
 
+    # Saved atomically, with no leftover temp file
+    assert list(manager.history_dir.iterdir()) == [history_file]
+
 
 def test_runtime_respects_no_history_config(tmp_path):
     """Test that runtime doesn't save history when preserve_history is False."""
@@ -165,6 +178,23 @@ def test_runtime_chat_with_mocked_input(tmp_path, monkeypatch, capsys):
     assert "Exiting chat" in captured.out
 
 
+def test_runtime_exit_command_is_case_insensitive(tmp_path, monkeypatch, capsys):
+    """Test that /QUIT ends the session without reaching the command handler."""
+    manager = AgentManager(base_path=tmp_path)
+    agent = Agent(name="test-agent", description="Test agent")
+
+    inputs = iter(["/QUIT"])
+    monkeypatch.setattr('builtins.input', lambda _: next(inputs))
+
+    with patch('aba.runtime.OpenRouterLanguageModel'):
+        runtime = AgentRuntime(agent, manager)
+        runtime.run()
+
+    captured = capsys.readouterr()
+    assert "Exiting chat" in captured.out
+    assert "Unknown command" not in captured.out
+
+
 def test_runtime_handles_help_command(tmp_path, monkeypatch, capsys):
     """Test that /help command shows help text."""
     manager = AgentManager(base_path=tmp_path)
@@ -231,3 +261,305 @@ def test_runtime_handles_clear_command(tmp_path, monkeypatch, capsys):
 
     captured = capsys.readouterr()
     assert "History cleared" in captured.out
+
+
+def test_runtime_executes_tool_calls(tmp_path, capsys):
+    """Test the tool loop: injected runtime argument, bad JSON, then a final answer."""
+    manager = AgentManager(base_path=tmp_path)
+    agent = Agent(name="test-agent", description="Test agent", system_prompt="Be brief.")
+
+    with patch('aba.runtime.OpenRouterLanguageModel') as mock_model_class:
+        mock_model = MagicMock()
+        mock_model.chat_stream.side_effect = [
+            _stream({"content": None, "tool_calls": [
+                {"id": "1", "function": {"name": "get_context_info", "arguments": "{}"}},
+                {"id": "2", "function": {"name": "get_context_info", "arguments": "{bad"}},
+            ]}, {"total_tokens": 10}),
+            _stream({"content": "Done"}, {"total_tokens": 20}),
+        ]
+        mock_model_class.return_value = mock_model
+
+        runtime = AgentRuntime(agent, manager)
+        response = runtime._generate_response("How much context is used?")
+
+    assert response == "Done"
+    tool_calls = runtime._current_tool_calls
+    assert [tc["success"] for tc in tool_calls] == [True, False]
+    assert "Context Window Usage" in tool_calls[0]["result"]
+    assert tool_calls[1]["result"].startswith("Error: Invalid JSON arguments")
+
+    # The tool results are sent back to the model on the second request
+    second_messages = mock_model.chat_stream.call_args_list[1][0][0]
+    assert second_messages[0] == {"role": "system", "content": "Be brief."}
+    assert [m["role"] for m in second_messages[-3:]] == ["assistant", "tool", "tool"]
+
+
+def test_runtime_sends_history_as_api_messages(tmp_path, monkeypatch):
+    """Test that earlier turns are sent in API form and failed turns are dropped."""
+    manager = AgentManager(base_path=tmp_path)
+    agent = Agent(name="test-agent", description="Test agent", config={"preserve_history": False})
+
+    inputs = iter(["Hello", "Fail", "Again", "/exit"])
+    monkeypatch.setattr('builtins.input', lambda _: next(inputs))
+
+    with patch('aba.runtime.OpenRouterLanguageModel') as mock_model_class:
+        mock_model = MagicMock()
+        mock_model.chat_stream.side_effect = [
+            _stream({"content": "Hi!"}, {"total_tokens": 5}),
+            RuntimeError("network down"),
+            _stream({"content": "Hi again!"}, {"total_tokens": 9}),
+        ]
+        mock_model_class.return_value = mock_model
+
+        runtime = AgentRuntime(agent, manager)
+        runtime.run()
+
+    last_messages = mock_model.chat_stream.call_args_list[-1][0][0]
+    assert last_messages[:3] == [
+        {"role": "user", "content": "Hello"},
+        {"role": "assistant", "content": "Hi!"},
+        {"role": "user", "content": "Again"},
+    ]
+    assert [entry[:2] for entry in runtime.history] == [
+        ("user", "Hello"), ("agent", "Hi!"), ("user", "Again"), ("agent", "Hi again!")
+    ]
+    assert list(runtime._window)[-1] == {"role": "assistant", "content": "Hi again!"}
+
+
+def test_runtime_history_window_is_bounded(tmp_path):
+    """Test that only the most recent history entries are sent to the model."""
+    manager = AgentManager(base_path=tmp_path)
+    agent = Agent(name="test-agent", description="Test agent")
+
+    with patch('aba.runtime.OpenRouterLanguageModel') as mock_model_class:
+        mock_model = MagicMock()
+        mock_model.chat_stream.return_value = _stream({"content": "ok"}, {"total_tokens": 1})
+        mock_model_class.return_value = mock_model
+
+        runtime = AgentRuntime(agent, manager)
+        for i in range(30):
+            runtime._append_history("user", f"message {i}", {})
+        runtime._generate_response("latest")
+
+    messages = mock_model.chat_stream.call_args[0][0]
+    assert len(runtime.history) == 30
+    assert len(messages) == 21  # 20 windowed entries plus the new input
+    assert messages[0]["content"] == "message 10"
+
+
+def test_runtime_prints_tool_progress(tmp_path, capsys):
+    """Test the user-visible output for a tool call."""
+    manager = AgentManager(base_path=tmp_path)
+    agent = Agent(name="test-agent", description="Test agent", capabilities=["file-operations"])
+    target = tmp_path / "notes.txt"
+    target.write_text("hello")
+
+    with patch('aba.runtime.OpenRouterLanguageModel') as mock_model_class:
+        mock_model = MagicMock()
+        mock_model.chat_stream.side_effect = [
+            _stream({"content": None, "tool_calls": [{"id": "1", "function": {
+                "name": "read_file", "arguments": f'{{"path": "{target}"}}'}}]}, {}),
+            _stream({"content": "Read it"}, {}),
+        ]
+        mock_model_class.return_value = mock_model
+
+        AgentRuntime(agent, manager)._generate_response("Read my notes")
+
+    out = capsys.readouterr().out
+    assert out == (
+        "\n🔧 Calling tool: read_file\n"
+        f'   Arguments: {{\n  "path": "{target}"\n}}\n'
+        "   Result: hello\n\n"
+        "test-agent: Read it\n\n"
+    )
+
+
+def test_runtime_runs_batched_tool_calls_concurrently(tmp_path):
+    """Test that parallel-safe calls from one model message run at once, results in order."""
+    import threading
+
+    from aba.tool_schema import tool
+
+    barrier = threading.Barrier(2, timeout=5)
+
+    @tool(parallel_safe=True)
+    def wait_for_peer(label: str) -> str:
+        """Block until the other call is running too.
+
+        Args:
+            label: Value to echo back
+        """
+        barrier.wait()
+        return label
+
+    manager = AgentManager(base_path=tmp_path)
+    agent = Agent(name="test-agent", description="Test agent")
+
+    with patch('aba.runtime.OpenRouterLanguageModel') as mock_model_class:
+        mock_model = MagicMock()
+        mock_model.chat_stream.side_effect = [
+            _stream({"content": None, "tool_calls": [
+                {"id": "a", "function": {"name": "wait_for_peer", "arguments": '{"label": "first"}'}},
+                {"id": "b", "function": {"name": "wait_for_peer", "arguments": '{"label": "second"}'}},
+            ]}, {}),
+            _stream({"content": "Both done"}, {}),
+        ]
+        mock_model_class.return_value = mock_model
+
+        runtime = AgentRuntime(agent, manager)
+        runtime.tool_schemas["wait_for_peer"] = wait_for_peer
+        assert runtime._generate_response("Run both") == "Both done"
+
+    tool_messages = [m for m in mock_model.chat_stream.call_args[0][0] if m["role"] == "tool"]
+    assert [(m["tool_call_id"], m["content"]) for m in tool_messages] == [
+        ("a", "first"), ("b", "second")
+    ]
+
+
+def test_runtime_runs_state_changing_tool_calls_in_order(tmp_path, monkeypatch):
+    """Test that a batch with any state-changing tool runs one call at a time."""
+    monkeypatch.chdir(tmp_path)
+    manager = AgentManager(base_path=tmp_path)
+    agent = Agent(name="test-agent", description="Test agent", capabilities=["file-operations"])
+
+    with patch('aba.runtime.OpenRouterLanguageModel') as mock_model_class:
+        mock_model = MagicMock()
+        mock_model.chat_stream.side_effect = [
+            _stream({"content": None, "tool_calls": [
+                {"id": "a", "function": {"name": "write_file", "arguments": '{"path": "n.txt", "content": "1"}'}},
+                {"id": "b", "function": {"name": "read_file", "arguments": '{"path": "n.txt"}'}},
+                {"id": "c", "function": {"name": "write_file", "arguments": '{"path": "n.txt", "content": "2"}'}},
+                {"id": "d", "function": {"name": "read_file", "arguments": '{"path": "n.txt"}'}},
+            ]}, {}),
+            _stream({"content": "Done"}, {}),
+        ]
+        mock_model_class.return_value = mock_model
+
+        runtime = AgentRuntime(agent, manager)
+        with patch('aba.runtime.ThreadPoolExecutor') as pool_class:
+            assert runtime._generate_response("Write and read") == "Done"
+        pool_class.assert_not_called()
+
+    tool_messages = [m for m in mock_model.chat_stream.call_args[0][0] if m["role"] == "tool"]
+    assert [m["content"] for m in tool_messages[1::2]] == ["1", "2"]
+
+
+def test_runtime_streams_reply_as_it_arrives(tmp_path, capsys):
+    """Test that reply deltas are printed in order and joined for history."""
+    manager = AgentManager(base_path=tmp_path)
+    agent = Agent(name="test-agent", description="Test agent")
+
+    def events(messages, tools=None):
+        yield {"type": "content", "delta": "Hel"}
+        # The first delta is already visible before the rest is generated
+        assert capsys.readouterr().out == "test-agent: Hel"
+        yield {"type": "content", "delta": "lo"}
+        yield {"type": "done", "usage": {"total_tokens": 4}}
+
+    with patch('aba.runtime.OpenRouterLanguageModel') as mock_model_class:
+        mock_model = MagicMock()
+        mock_model.chat_stream.side_effect = events
+        mock_model_class.return_value = mock_model
+
+        runtime = AgentRuntime(agent, manager)
+        assert runtime._generate_response("Hi") == "Hello"
+
+    assert capsys.readouterr().out == "lo\n\n"
+    assert runtime.current_usage == {"total_tokens": 4}
+
+
+def test_runtime_saves_history_periodically_and_when_changed(tmp_path, monkeypatch):
+    """Test that history is saved every few turns and on exit only if it changed."""
+    import json
+
+    manager = AgentManager(base_path=tmp_path)
+    agent = Agent(name="test-agent", description="Test agent")
+    history_file = manager.history_dir / "test-agent.json"
+
+    inputs = iter([f"message {i}" for i in range(6)] + ["/exit"])
+    monkeypatch.setattr('builtins.input', lambda _: next(inputs))
+
+    with patch('aba.runtime.OpenRouterLanguageModel') as mock_model_class:
+        mock_model = MagicMock()
+        mock_model.chat_stream.side_effect = lambda messages, tools=None: _stream(
+            {"content": "ok"}, {}
+        )
+        mock_model_class.return_value = mock_model
+
+        runtime = AgentRuntime(agent, manager)
+        with patch.object(runtime, "_save_history", wraps=runtime._save_history) as save:
+            runtime.run()
+        assert save.call_count == 2  # after the fifth turn, then on exit
+        assert len(json.loads(history_file.read_text())) == 12
+
+        # A session with no new turns leaves the file untouched
+        inputs = iter(["/exit"])
+        runtime = AgentRuntime(agent, manager)
+        with patch.object(runtime, "_save_history") as save:
+            runtime.run()
+        save.assert_not_called()
+
+
+def test_runtime_failed_periodic_save_keeps_the_turn(tmp_path, monkeypatch, capsys):
+    """Test that a failing periodic save is reported as such and loses no history."""
+    manager = AgentManager(base_path=tmp_path)
+    agent = Agent(name="test-agent", description="Test agent")
+
+    inputs = iter([f"message {i}" for i in range(5)] + ["/exit"])
+    monkeypatch.setattr('builtins.input', lambda _: next(inputs))
+
+    with patch('aba.runtime.OpenRouterLanguageModel') as mock_model_class:
+        mock_model = MagicMock()
+        mock_model.chat_stream.side_effect = lambda messages, tools=None: _stream(
+            {"content": "ok"}, {}
+        )
+        mock_model_class.return_value = mock_model
+
+        runtime = AgentRuntime(agent, manager)
+        real_save = runtime._save_history
+        failures = iter([OSError("disk full")])
+
+        def flaky_save():
+            for exc in failures:
+                raise exc
+            real_save()
+
+        monkeypatch.setattr(runtime, "_save_history", flaky_save)
+        runtime.run()
+
+    out = capsys.readouterr().out
+    assert "Error saving history: disk full" in out
+    assert "Error contacting language model" not in out
+    assert [role for role, _, _ in runtime.history] == ["user", "agent"] * 5
+    # Still dirty after the failure, so the exit save wrote everything
+    assert len(_json.loads((manager.history_dir / "test-agent.json").read_bytes())) == 10
+
+
+def test_runtime_quiet_tool_output_truncates_arguments(tmp_path, capsys):
+    """Test that verbose_tools=False hides arguments and long values are shortened."""
+    manager = AgentManager(base_path=tmp_path)
+    agent = Agent(
+        name="test-agent",
+        description="Test agent",
+        capabilities=["file-operations"],
+        config={"verbose_tools": False},
+    )
+    target = tmp_path / "notes.txt"
+    arguments = _json.dumps({"path": str(target), "content": "x" * 500}).decode()
+
+    with patch('aba.runtime.OpenRouterLanguageModel') as mock_model_class:
+        mock_model = MagicMock()
+        mock_model.chat_stream.side_effect = [
+            _stream({"content": None, "tool_calls": [{"id": "1", "function": {
+                "name": "write_file", "arguments": arguments}}]}, {}),
+            _stream({"content": "Saved"}, {}),
+        ]
+        mock_model_class.return_value = mock_model
+
+        runtime = AgentRuntime(agent, manager)
+        runtime._generate_response("Save my notes")
+
+    assert "Arguments" not in capsys.readouterr().out
+    assert target.read_text() == "x" * 500
+    recorded = runtime._current_tool_calls[0]["arguments"]
+    assert recorded["content"] == "x" * 200 + "…"
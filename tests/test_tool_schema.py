@@ -1,6 +1,7 @@
 """Tests for tool schema system."""
 
-from aba.tool_schema import ToolParameter, ToolSchema, tool
+from aba import tool_schema
+from aba.tool_schema import ToolParameter, ToolSchema, registered_tools, tool
 
 
 def test_tool_decorator_extracts_schema():
@@ -79,6 +80,9 @@ def test_tool_schema_to_openrouter_format():
     assert "limit" in params["properties"]
     assert params["required"] == ["query"]
 
+    # The format is built once and reused
+    assert schema.to_openrouter_format() is result
+
 
 def test_tool_decorator_skips_private_params():
     """Test that parameters starting with _ are skipped."""
@@ -124,3 +128,135 @@ def test_tool_decorator_handles_various_types():
     assert params["decimal"] == "number"
     assert params["flag"] == "boolean"
     assert params["items"] == "array"
+
+
+def test_tool_schema_records_injected_params():
+    """Test that schemas record which internal parameters to inject."""
+    @tool
+    def managed(name: str, _manager=None) -> str:
+        """Use the manager.
+
+        Args:
+            name: Agent name
+        """
+        return name
+
+    @tool
+    def plain(name: str) -> str:
+        """Plain tool.
+
+        Args:
+            name: Agent name
+        """
+        return name
+
+    assert managed.needs_manager is True
+    assert managed.needs_runtime is False
+    assert plain.needs_manager is False
+    assert plain.needs_runtime is False
+    assert managed.public_params == ("name",)
+    assert plain.public_params == ("name",)
+
+
+def test_tool_decorator_marks_parallel_safe_tools():
+    """Test that only tools declared parallel-safe are marked so."""
+    from aba.tools import TOOL_SCHEMAS
+
+    @tool(parallel_safe=True)
+    def lookup(key: str) -> str:
+        """Look something up.
+
+        Args:
+            key: Key to find
+        """
+        return key
+
+    assert lookup.parallel_safe is True
+    assert lookup("k") == "k"
+    assert TOOL_SCHEMAS["read_file"].parallel_safe is True
+    assert TOOL_SCHEMAS["write_file"].parallel_safe is False
+    assert TOOL_SCHEMAS["exec_python"].parallel_safe is False
+
+
+def test_tool_decorator_parses_multiline_arg_descriptions():
+    """Test that wrapped Args descriptions are joined and later sections ignored."""
+    @tool
+    def search(query: str, limit: int = 10) -> str:
+        """Search for something.
+
+        Args:
+            query: Text to search for,
+                possibly spanning lines
+            limit: Maximum number of results
+
+        Returns:
+            Matching results
+        """
+        return query
+
+    descriptions = {param.name: param.description for param in search.parameters}
+    assert descriptions == {
+        "query": "Text to search for, possibly spanning lines",
+        "limit": "Maximum number of results",
+    }
+
+
+def test_tool_decorator_defers_schema_extraction(monkeypatch):
+    """Test that @tool only inspects the function when the schema is first used."""
+    calls = []
+    describe = tool_schema._describe_function
+    monkeypatch.setattr(
+        tool_schema, "_describe_function", lambda func: calls.append(func) or describe(func)
+    )
+
+    @tool
+    def greet(name: str) -> str:
+        """Greet someone.
+
+        Args:
+            name: Who to greet
+        """
+        return f"Hello {name}"
+
+    assert greet("Ada") == "Hello Ada"
+    assert calls == []
+
+    assert greet.description == "Greet someone."
+    assert [param.name for param in greet.parameters] == ["name"]
+    assert len(calls) == 1
+
+
+def test_tool_schema_uses_slots():
+    """Test that schema objects carry no per-instance __dict__."""
+    schema = ToolSchema(name="noop", description="Does nothing", function=lambda: None)
+
+    assert not hasattr(schema, "__dict__")
+    assert not hasattr(ToolParameter("a", "string", "A"), "__dict__")
+
+
+def test_python_type_to_json_type():
+    """Test type mapping for real types, string spellings and unknown annotations."""
+    from aba.tool_schema import _python_type_to_json_type
+
+    assert _python_type_to_json_type(int) == "integer"
+    assert _python_type_to_json_type(dict) == "object"
+    assert _python_type_to_json_type(" Bool ") == "boolean"
+    assert _python_type_to_json_type("dict") == "object"
+    assert _python_type_to_json_type("Optional[int]") == "integer"
+    assert _python_type_to_json_type(bytes) == "string"
+
+
+def test_tool_registers_schema_by_module():
+    """Test that @tool records schemas per defining module, in order."""
+    from aba import tools
+
+    assert list(tools.TOOL_SCHEMAS.values()) == list(registered_tools("aba.tools"))
+    assert "get_context_info" in tools.TOOL_SCHEMAS
+
+    @tool
+    def local_tool() -> str:
+        """A tool defined outside aba.tools."""
+        return "ok"
+
+    assert registered_tools(__name__)[-1] is local_tool
+    assert "local_tool" not in tools.TOOL_SCHEMAS
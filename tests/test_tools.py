@@ -1,11 +1,23 @@
 """Tests for agent tools."""
 
+import os
 from pathlib import Path
 
+import pytest
+
+from aba import _python_worker, tools
 from aba.agent_manager import AgentManager
+from aba.capabilities import CAPABILITIES
 from aba.tools import (
+    CAPABILITY_TOOL_SCHEMAS,
+    TOOL_SCHEMAS,
+    copy_file,
     create_agent,
     delete_agent,
+    exec_python,
+    exec_shell,
+    get_context_info,
+    get_agent_details,
     list_agents,
     read_file,
     write_file,
@@ -115,6 +127,38 @@ def test_list_agents_tool(tmp_path):
     assert "agent-two" in result
 
 
+def test_list_agents_marks_last_and_unreadable(tmp_path):
+    """Test the exact list_agents output, including an unreadable agent file."""
+    manager = AgentManager(base_path=tmp_path)
+    create_agent("agent-one", "First", capabilities=["web-access"], _manager=manager)
+    create_agent("agent-two", "Second", _manager=manager)
+    (manager.agents_dir / "broken.json").write_text("{not json")
+    manager.set_last_agent("agent-two")
+
+    assert list_agents(_manager=manager) == (
+        "Available agents:\n"
+        "  agent-one - First [web-access]\n"
+        "* agent-two - Second [chat only]\n"
+        "  broken"
+    )
+
+
+def test_get_agent_details_tool(tmp_path):
+    """Test the sections of get_agent_details output."""
+    manager = AgentManager(base_path=tmp_path)
+    create_agent(
+        "helper", "Helps", capabilities=["file-operations"],
+        system_prompt="x" * 250, _manager=manager,
+    )
+
+    result = get_agent_details("helper", _manager=manager)
+
+    assert result.startswith("Agent: helper\nDescription: Helps\n")
+    assert "\n\nCapabilities:\n  - file-operations\n\nConfiguration:\n  model: " in result
+    assert result.endswith("\n\nSystem Prompt:\n  " + "x" * 200 + "...")
+    assert get_agent_details("missing", _manager=manager) == "Error: Agent 'missing' not found"
+
+
 def test_read_file_tool(tmp_path):
     """Test reading a file via tool."""
     test_file = tmp_path / "test.txt"
@@ -142,6 +186,33 @@ def test_write_file_tool(tmp_path):
     assert test_file.read_text() == "Test content"
 
 
+def test_read_file_maps_large_files(tmp_path, monkeypatch):
+    """Test that files over the mmap threshold decode the same way."""
+    monkeypatch.setattr(tools, "_MMAP_THRESHOLD", 16)
+    test_file = tmp_path / "large.txt"
+    test_file.write_bytes("línea\r\n".encode() * 10)
+
+    assert read_file(str(test_file)) == "línea\n" * 10
+
+    (tmp_path / "bad.txt").write_bytes(b"\xff" * 32)
+    assert read_file(str(tmp_path / "bad.txt")).startswith("Error reading file:")
+
+
+def test_tools_import_does_not_load_subprocess():
+    """Test that importing the tools module leaves subprocess unloaded."""
+    import subprocess
+    import sys
+
+    code = "import sys, aba.tools; print('subprocess' in sys.modules)"
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": str(Path(tools.__file__).parents[1])},
+    )
+    assert result.stdout == "False\n", result.stderr
+
+
 def test_list_files_tool(tmp_path):
     """Test listing files via tool."""
     # Create some files
@@ -179,3 +250,184 @@ def test_delete_file_not_found():
     result = delete_file("/nonexistent/file.txt")
     assert "Error" in result
     assert "not found" in result
+
+
+def test_capability_tool_schemas_index():
+    """Test that the capability index lists every registered tool of each capability."""
+    assert set(CAPABILITY_TOOL_SCHEMAS) == set(CAPABILITIES)
+
+    for name, capability in CAPABILITIES.items():
+        expected = [(tool, TOOL_SCHEMAS[tool]) for tool in capability.tools if tool in TOOL_SCHEMAS]
+        assert list(CAPABILITY_TOOL_SCHEMAS[name]) == expected
+
+
+def test_list_files_sorted_with_directory_markers(tmp_path):
+    """Test list_files output order, markers, sizes and the not-a-directory error."""
+    (tmp_path / "b.txt").write_text("content")
+    (tmp_path / "a_dir").mkdir()
+    (tmp_path / "link").symlink_to(tmp_path / "a_dir")
+    (tmp_path / "dangling").symlink_to(tmp_path / "missing")
+
+    assert list_files(str(tmp_path)) == (
+        f"Contents of {tmp_path}:\n📁 a_dir\n📄 b.txt (7 bytes)\n📄 dangling\n📁 link"
+    )
+    assert list_files(str(tmp_path / "b.txt")) == f"Error: '{tmp_path / 'b.txt'}' is not a directory"
+
+
+def test_read_write_file_round_trip_unicode(tmp_path):
+    """Test that file tools handle non-ASCII text and normalize line endings."""
+    test_file = tmp_path / "notes.txt"
+
+    result = write_file(str(test_file), "héllo\n")
+    assert result == f"✓ Wrote 7 bytes to {test_file}"
+    assert read_file(str(test_file)) == "héllo\n"
+
+    test_file.write_bytes(b"one\r\ntwo\rthree")
+    assert read_file(str(test_file)) == "one\ntwo\nthree"
+
+    # Writing a shorter file truncates the old contents
+    write_file(str(test_file), "x")
+    assert test_file.read_bytes() == b"x"
+
+
+def test_copy_file_tool(tmp_path):
+    """Test copying a file via tool."""
+    source = tmp_path / "source.txt"
+    source.write_bytes(b"copied \xe2\x9c\x93")
+    destination = tmp_path / "destination.txt"
+
+    result = copy_file(str(source), str(destination))
+
+    assert result == f"✓ Copied 10 bytes from {source} to {destination}"
+    assert destination.read_bytes() == source.read_bytes()
+
+    result = copy_file(str(tmp_path / "missing.txt"), str(destination))
+    assert result == f"Error: File '{tmp_path / 'missing.txt'}' not found"
+    result = copy_file(str(source), str(tmp_path / "no-dir" / "copy.txt"))
+    assert result.startswith("Error copying file:")
+
+
+@pytest.fixture
+def python_workers():
+    """Start and end the test with no pooled exec_python workers."""
+    _python_worker._close_idle_workers()
+    yield _python_worker._IDLE
+    _python_worker._close_idle_workers()
+
+
+def test_exec_python_reuses_worker_without_sharing_state(tmp_path, monkeypatch, python_workers):
+    """Test that exec_python runs on a warm process but isolates each snippet."""
+    monkeypatch.chdir(tmp_path)
+
+    first = exec_python(
+        "import builtins, json, os\n"
+        "x = 1\n"
+        "json.dumps = lambda *a, **k: 'patched'\n"
+        "builtins.len = lambda obj: 42\n"
+        "os.chdir('/')\n"
+        "print(os.getppid())"
+    )
+    second = exec_python(
+        "import json, os\n"
+        "print(os.getppid())\n"
+        "print(os.getcwd())\n"
+        "print('x' in globals())\n"
+        "print(json.dumps([len('ab')]))"
+    )
+
+    worker_pid, cwd, has_x, dumped = second.splitlines()
+    assert first.strip() == worker_pid
+    assert cwd == str(tmp_path)
+    assert has_x == "False"
+    assert dumped == "[2]"
+    assert len(python_workers) == 1
+
+
+def test_exec_python_follows_host_cwd_and_environment(tmp_path, monkeypatch, python_workers):
+    """Test that a pooled worker runs snippets in the host's current cwd and env."""
+    first_dir = tmp_path / "a"
+    second_dir = tmp_path / "b"
+    first_dir.mkdir()
+    second_dir.mkdir()
+    snippet = "import os\nprint(os.getcwd())\nprint(os.environ.get('ABA_TEST_VAR'))"
+
+    monkeypatch.chdir(first_dir)
+    monkeypatch.setenv("ABA_TEST_VAR", "one")
+    assert exec_python(snippet) == f"{first_dir}\none\n"
+
+    monkeypatch.chdir(second_dir)
+    monkeypatch.setenv("ABA_TEST_VAR", "two")
+    assert exec_python(snippet) == f"{second_dir}\ntwo\n"
+
+    monkeypatch.delenv("ABA_TEST_VAR")
+    assert exec_python(snippet) == f"{second_dir}\nNone\n"
+    assert len(python_workers) == 1
+
+
+def test_exec_python_reports_errors_and_timeouts(monkeypatch, python_workers):
+    """Test error output, exit calls and the timeout path of exec_python."""
+    result = exec_python("print('before')\nraise ValueError('boom')")
+    assert result.startswith("before\n\nErrors:\nTraceback")
+    assert "ValueError: boom" in result
+    assert "_python_worker" not in result
+
+    assert exec_python("import sys; sys.exit('bye')") == "\nErrors:\nbye\n"
+    assert exec_python("pass") == "✓ Code executed (no output)"
+    assert exec_python("import os\nprint('hi')\nos._exit(0)") == "hi\n"
+
+    monkeypatch.setattr(tools, "_EXEC_TIMEOUT", 0.5)
+    assert exec_python("while True: pass") == "Error: Code execution timed out (10s limit)"
+    assert exec_python("print('recovered')") == "recovered\n"
+
+
+def test_exec_shell_runs_plain_commands_without_shell(tmp_path, monkeypatch):
+    """Test that only commands needing shell features go through the shell."""
+    import subprocess
+
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "a.txt").write_text("hello\n")
+    calls = []
+    real_run = subprocess.run
+
+    def recording_run(args, **kwargs):
+        calls.append(kwargs.get("shell", False))
+        return real_run(args, **kwargs)
+
+    monkeypatch.setattr(subprocess, "run", recording_run)
+
+    assert exec_shell("cat a.txt") == "hello\n"
+    assert exec_shell("cat a.txt | tr a-z A-Z") == "HELLO\n"
+    assert exec_shell("echo $HOME") == f"{os.environ['HOME']}\n"
+    assert exec_shell("cd /") == "✓ Command executed (no output)"
+    assert exec_shell("FOO=bar env").count("FOO=bar") == 1
+    assert calls == [False, True, True, True, True]
+
+    result = exec_shell("definitely-not-a-command-xyz")
+    assert "Errors:" in result and "not found" in result
+
+
+def test_get_context_info_tool():
+    """Test the context usage report with and without usage data."""
+    from types import SimpleNamespace
+
+    runtime = SimpleNamespace(
+        agent=SimpleNamespace(config={"model": "openai/gpt-3.5-turbo"}),
+        current_usage={"prompt_tokens": 1200, "completion_tokens": 300, "total_tokens": 1500},
+    )
+
+    assert get_context_info(_runtime=runtime) == (
+        "Context Window Usage:\n"
+        "  Model: openai/gpt-3.5-turbo\n"
+        "  Context limit: 16,385 tokens\n"
+        "  Prompt tokens: 1,200\n"
+        "  Completion tokens: 300\n"
+        "  Total tokens: 1,500\n"
+        "  Usage: 9.2%\n"
+        "  Remaining: 14,885 tokens"
+    )
+
+    runtime.current_usage = {}
+    assert get_context_info(_runtime=runtime) == (
+        "No usage data available yet.\nModel: openai/gpt-3.5-turbo\nContext limit: 16,385 tokens"
+    )
+    assert get_context_info() == "Error: Runtime context not available"
@@ -8,6 +8,7 @@ export interface Message {
 }
 
 export interface ToolCall {
+  id?: string;
   name: string;
   arguments: Record<string, any>;
   result?: string;
@@ -20,6 +21,7 @@ interface WebSocketMessage {
   message?: string;
   is_complete?: boolean;
   tool_name?: string;
+  tool_call_id?: string;
   arguments?: Record<string, any>;
   result?: string;
   success?: boolean;
@@ -129,6 +131,7 @@ export function useWebSocket(agentName: string) {
                   tools: [
                     ...existingTools,
                     {
+                      id: data.tool_call_id,
                       name: data.tool_name || 'unknown',
                       arguments: data.arguments || {},
                     },
@@ -145,6 +148,7 @@ export function useWebSocket(agentName: string) {
                   timestamp: new Date(),
                   tools: [
                     {
+                      id: data.tool_call_id,
                       name: data.tool_name || 'unknown',
                       arguments: data.arguments || {},
                     },
@@ -161,16 +165,22 @@ export function useWebSocket(agentName: string) {
           console.log(`[WebSocket] Tool result: ${data.tool_name} (success=${data.success})`);
           // Find and update the tool result in the most recent message with this tool
           setMessages((prev) => {
+            // Match on the call id, so two calls of the same tool each get their
+            // own result; fall back to the name for servers that don't send ids
+            const isPending = (t: ToolCall) =>
+              !t.result &&
+              (data.tool_call_id ? t.id === data.tool_call_id : t.name === data.tool_name);
             // Search backwards for the message containing this tool
             for (let i = prev.length - 1; i >= 0; i--) {
               const msg = prev[i];
-              if (msg.tools && msg.tools.some(t => t.name === data.tool_name && !t.result)) {
+              const index = msg.tools ? msg.tools.findIndex(isPending) : -1;
+              if (msg.tools && index !== -1) {
                 return [
                   ...prev.slice(0, i),
                   {
                     ...msg,
-                    tools: msg.tools.map((tool) =>
-                      tool.name === data.tool_name && !tool.result
+                    tools: msg.tools.map((tool, toolIndex) =>
+                      toolIndex === index
                         ? { ...tool, result: data.result, success: data.success }
                         : tool
                     ),